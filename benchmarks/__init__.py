@@ -0,0 +1,10 @@
+"""
+Benchmarks for datashape.
+
+The modules follow the asv conventions (``time_*`` and ``track_*``
+functions, with ``params`` and ``param_names``), and run either with
+asv, configured in ``asv.conf.json``, or offline with
+``python -m benchmarks.run``, which can also compare against the
+results committed in ``benchmarks/baseline.json``.  Each module can
+also be run on its own for a more detailed table.
+"""
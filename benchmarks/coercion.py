@@ -0,0 +1,39 @@
+"""
+Speed of coercion cost lookups.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.coercion``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import timeit
+
+from datashape import coercion
+from datashape.typesets import signed, unsigned, floating, complexes
+
+
+types = list(signed) + list(unsigned) + list(floating) + list(complexes)
+# 8 argument types against 260 signature measures
+srcs = types[:8]
+dsts = types * 20
+
+
+def time_coercion_cost_pair():
+    coercion.dtype_coercion_cost(srcs[0], dsts[-1])
+
+
+def time_coercion_cost_loop():
+    [[coercion.dtype_coercion_cost(src, dst) for dst in dsts] for src in srcs]
+
+
+def time_coercion_cost_matrix():
+    coercion.coercion_cost_matrix(srcs, dsts)
+
+
+if __name__ == '__main__':
+    for func in (time_coercion_cost_pair, time_coercion_cost_loop,
+                 time_coercion_cost_matrix):
+        n = 200
+        t = min(timeit.repeat(func, number=n, repeat=5))
+        print('%-28s %10.2f us' % (func.__name__[5:], t / n * 1e6))
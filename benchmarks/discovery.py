@@ -0,0 +1,98 @@
+"""
+Speed of datashape discovery.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.discovery``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import timeit
+from datetime import datetime
+
+import numpy as np
+from multipledispatch import Dispatcher
+
+from datashape.coretypes import int32, int64, float64, string, bool_, null
+from datashape.discovery import (discover, lowest_common_dshape,
+                                 _lowest_common_dshape)
+
+
+column = [int32, int64, int32, float64, int64] * 200
+mixed = [int32, bool_, null, float64]
+
+
+def time_lowest_common_dshape_column():
+    lowest_common_dshape(column)
+
+
+def time_lowest_common_dshape_pair():
+    lowest_common_dshape([int32, float64])
+
+
+def time_lowest_common_dshape_mixed():
+    lowest_common_dshape(mixed)
+
+
+scalars = {'int': 1, 'float': 1.5, 'bool': True, 'None': None,
+           'np.float64': np.float64(1.5), 'np.int32': np.int32(1),
+           'str': 'Alice', 'datetime': datetime(2000, 1, 1, 12)}
+
+
+def time_discover_scalar(name):
+    discover(scalars[name])
+time_discover_scalar.params = sorted(scalars)
+time_discover_scalar.param_names = ['type']
+
+
+collections = {
+    'list': list(range(1000)),
+    'nested list': [[1, 2.5, 3], [4, 5, 6]] * 200,
+    'dict': dict(('f%d' % i, i) for i in range(100)),
+    'records': [{'name': 'Alice', 'amount': 100, 'id': i}
+                for i in range(500)],
+    'ndarray': np.zeros((100, 100)),
+}
+
+
+def time_discover_collection(name):
+    discover(collections[name])
+time_discover_collection.params = sorted(collections)
+time_discover_collection.param_names = ['type']
+
+
+def time_discover_scalar_dispatch(name):
+    Dispatcher.__call__(discover, scalars[name])
+time_discover_scalar_dispatch.params = sorted(scalars)
+time_discover_scalar_dispatch.param_names = ['type']
+
+
+if __name__ == '__main__':
+    cases = [('column', column), ('pair', [int32, float64]),
+             ('mixed', mixed), ('string', [string, int64])]
+    print('%-8s %14s %14s' % ('case', 'lattice (us)', 'table (us)'))
+    for name, dshapes in cases:
+        times = []
+        for func in (_lowest_common_dshape, lowest_common_dshape):
+            n = 200
+            t = min(timeit.repeat(lambda: func(dshapes), number=n, repeat=5))
+            times.append(t / n * 1e6)
+        print('%-8s %14.2f %14.2f' % ((name,) + tuple(times)))
+
+    print()
+    print('%-10s %14s %14s' % ('scalar', 'dispatch (ns)', 'discover (ns)'))
+    for name in sorted(scalars):
+        times = []
+        for func in (time_discover_scalar_dispatch, time_discover_scalar):
+            n = 20000
+            t = min(timeit.repeat(lambda: func(name), number=n, repeat=5))
+            times.append(t / n * 1e9)
+        print('%-10s %14.0f %14.0f' % ((name,) + tuple(times)))
+
+    print()
+    print('%-12s %14s' % ('collection', 'discover (us)'))
+    for name in sorted(collections):
+        n = 10
+        t = min(timeit.repeat(lambda: time_discover_collection(name),
+                              number=n, repeat=5))
+        print('%-12s %14.1f' % (name, t / n * 1e6))
@@ -0,0 +1,62 @@
+"""
+Cold import time of datashape, measured with ``python -X importtime``.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.imports``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import subprocess
+import sys
+
+
+statements = {
+    'import': 'import datashape',
+    'parse': 'import datashape; datashape.dshape("var * {a: int32}")',
+    'discover': 'import datashape; datashape.discover([1, 2])',
+}
+
+
+def import_times(statement):
+    """
+    Cumulative import time in microseconds of every module imported
+    by running ``statement`` in a fresh interpreter
+    """
+    err = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stderr=subprocess.STDOUT, universal_newlines=True)
+    times = {}
+    for line in err.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def track_import_time(name):
+    return import_times(statements[name]).get('datashape')
+track_import_time.params = sorted(statements)
+track_import_time.param_names = ['statement']
+track_import_time.unit = 'microseconds'
+
+
+def track_modules_imported(name):
+    return len(import_times(statements[name]))
+track_modules_imported.params = sorted(statements)
+track_modules_imported.param_names = ['statement']
+track_modules_imported.unit = 'modules'
+
+
+if __name__ == '__main__':
+    heavy = ['numpy', 'dateutil.parser', 'multipledispatch', 'unittest',
+             'datashape.coercion']
+    print('%-10s %12s %8s  %s' % ('statement', 'time (ms)', 'modules',
+                                  'heavy modules loaded'))
+    for name in sorted(statements):
+        runs = [import_times(statements[name]) for _ in range(5)]
+        best = min(times['datashape'] for times in runs)
+        print('%-10s %12.1f %8d  %s' % (
+            name, best / 1e3, len(runs[0]),
+            ', '.join(m for m in heavy if m in runs[0])))
@@ -0,0 +1,69 @@
+"""
+Memory footprint of datashape type instances.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.memory``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import tracemalloc
+
+from datashape.coretypes import (CType, DataShape, Fixed, Option, Record,
+                                 String, Tuple, int32, string, var)
+
+
+N = 10000
+
+
+def _ctype():
+    # Bypass CType.__init__, which registers the name globally
+    ct = object.__new__(CType)
+    ct.name, ct._itemsize, ct._alignment = 'int32', 4, 4
+    return ct
+
+
+makers = {
+    'Fixed': lambda: Fixed(10),
+    'CType': _ctype,
+    'String': String,
+    'DataShape': lambda: DataShape(var, int32),
+    'Option': lambda: Option(int32),
+    'Tuple': lambda: Tuple([int32, string]),
+    'Record': lambda: Record([('a', int32), ('b', string)]),
+}
+
+
+def bytes_per_instance(make, hashed, n=N):
+    """
+    Average number of bytes allocated and kept alive by ``make()``,
+    optionally after hashing the instance once (as when used as a key).
+    """
+    objs = [None] * n
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(n):
+            obj = make()
+            if hashed:
+                hash(obj)
+            objs[i] = obj
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / n
+
+
+def track_bytes_per_instance(typename, hashed):
+    return bytes_per_instance(makers[typename], hashed)
+track_bytes_per_instance.params = (sorted(makers), [False, True])
+track_bytes_per_instance.param_names = ['type', 'hashed']
+track_bytes_per_instance.unit = 'bytes'
+
+
+if __name__ == '__main__':
+    print('%-10s %10s %10s' % ('type', 'bytes', 'hashed'))
+    for typename in sorted(makers):
+        print('%-10s %10.1f %10.1f' % (typename,
+                    track_bytes_per_instance(typename, False),
+                    track_bytes_per_instance(typename, True)))
@@ -0,0 +1,44 @@
+"""
+Speed of converting between datashapes and NumPy shapes and dtypes.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.numpy_interop``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import timeit
+
+from datashape import dshape, to_numpy, from_numpy
+
+
+cases = {
+    'scalar': dshape('float64'),
+    'array': dshape('10 * 20 * int32'),
+    'record': dshape('100 * {id: int64, x: float32, y: float32, '
+                     'flag: bool}'),
+}
+numpy_cases = dict((name, to_numpy(ds)) for name, ds in cases.items())
+
+
+def time_to_numpy(name):
+    to_numpy(cases[name])
+time_to_numpy.params = sorted(cases)
+time_to_numpy.param_names = ['type']
+
+
+def time_from_numpy(name):
+    from_numpy(*numpy_cases[name])
+time_from_numpy.params = sorted(cases)
+time_from_numpy.param_names = ['type']
+
+
+if __name__ == '__main__':
+    print('%-8s %16s %16s' % ('type', 'to_numpy (us)', 'from_numpy (us)'))
+    for name in sorted(cases):
+        times = []
+        for func in (time_to_numpy, time_from_numpy):
+            n = 2000
+            t = min(timeit.repeat(lambda: func(name), number=n, repeat=5))
+            times.append(t / n * 1e6)
+        print('%-8s %16.2f %16.2f' % ((name,) + tuple(times)))
@@ -0,0 +1,97 @@
+"""
+Speed of overload resolution.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.overloading``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import timeit
+from itertools import product
+
+from datashape import dshape
+from datashape.coretypes import Tuple
+from datashape.overload_resolver import OverloadResolver
+
+
+measures = ['bool', 'int8', 'int16', 'int32', 'int64', 'uint8', 'uint16',
+            'uint32', 'uint64', 'float32', 'float64', 'complex[float32]',
+            'complex[float64]']
+dims = ['', 'A... * ', 'N * ', '10 * ', 'var * ', '3 * N * ',
+        'M * N * K * ']
+
+
+def make_resolver():
+    """ ufunc-like kernels of one to three arguments """
+    ores = OverloadResolver('kernel')
+    ores.extend_overloads(['(%s) -> %s%s' % (', '.join([d + m] * nargs), d, m)
+                           for nargs, d, m in product([1, 2, 3], dims,
+                                                      measures)])
+    return ores
+
+
+def make_sized_resolver(n):
+    """ ``n`` binary kernels, over ever more fixed dimension sizes """
+    sized_dims = dims + ['%d * ' % i for i in range(1, 72)]
+    ores = OverloadResolver('kernel%d' % n)
+    sigs = ['(%s%s, %s%s) -> %s%s' % (d, m, d, m, d, m)
+            for d, m in product(sized_dims, measures)]
+    ores.extend_overloads(sigs[:n])
+    return ores
+
+
+queries = {
+    'scalar': Tuple([dshape('int32'), dshape('int32')]),
+    'vector': Tuple([dshape('10 * float32'), dshape('10 * float32')]),
+    'matrix': Tuple([dshape('3 * 4 * uint16'), dshape('3 * 4 * float64')]),
+}
+
+resolver = make_resolver()
+sizes = [10, 100, 1000]
+sized_resolvers = dict((n, make_sized_resolver(n)) for n in sizes)
+
+
+def time_resolve_overload(name):
+    resolver.resolve_overload(queries[name])
+time_resolve_overload.params = sorted(queries)
+time_resolve_overload.param_names = ['query']
+
+
+def time_resolve_overload_uncached(name):
+    resolver._resolve_overload(queries[name], None)
+time_resolve_overload_uncached.params = sorted(queries)
+time_resolve_overload_uncached.param_names = ['query']
+
+
+def time_resolve_overload_count(n):
+    sized_resolvers[n]._resolve_overload(queries['scalar'], None)
+time_resolve_overload_count.params = sizes
+time_resolve_overload_count.param_names = ['overloads']
+
+
+def full_scan(name):
+    argstype = queries[name]
+    resolver._match_overloads(argstype, resolver._by_arity[2].all, None)
+
+
+if __name__ == '__main__':
+    print('%d overloads, %d binary' % (
+        sum(len(index.all) for index in resolver._by_arity.values()),
+        len(resolver._by_arity[2].all)))
+    print('%-8s %12s %12s %12s' % ('query', 'full (us)', 'indexed (us)',
+                                    'cached (us)'))
+    for name in sorted(queries):
+        times = []
+        for func in (full_scan, time_resolve_overload_uncached,
+                     time_resolve_overload):
+            t = min(timeit.repeat(lambda: func(name), number=5, repeat=3))
+            times.append(t / 5 * 1e6)
+        print('%-8s %12.1f %12.1f %12.1f' % ((name,) + tuple(times)))
+
+    print()
+    print('%-10s %14s' % ('overloads', 'uncached (us)'))
+    for n in sizes:
+        t = min(timeit.repeat(lambda: time_resolve_overload_count(n),
+                              number=5, repeat=3))
+        print('%-10d %14.1f' % (n, t / 5 * 1e6))
@@ -0,0 +1,118 @@
+"""
+Throughput of the datashape lexer and parser, and of the binary
+serialization format for comparison.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.parsing``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import pickle
+import timeit
+
+from datashape import dshape, lexer, parser, serialization
+from datashape.util import clear_cache
+from datashape.type_symbol_table import sym
+
+
+# Datashapes of the kind found in real schemas
+corpus = [
+    'int32',
+    '10 * float64',
+    'var * string',
+    '3 * 4 * complex[float64]',
+    '?datetime',
+    'var * {name: string, amount: ?int64, id: int32}',
+    'var * {id: int64, name: string[30], score: float32, '
+    'timestamp: datetime[tz="UTC"], tags: 5 * string}',
+    '10 * var * {x: float64, y: float64, z: float64}',
+    'var * (int32, string, ?float64)',
+    '(A... * float32, A... * float32) -> A... * float32',
+    '(M * N * float64, N * K * float64) -> M * K * float64',
+    'var * {"first name": string, "last name": string, '
+    'address: {street: string, city: string, zip: string}}',
+]
+size = sum(len(s) for s in corpus)
+types = [parser.parse(s, sym) for s in corpus]
+encoded = [serialization.dumps(ds) for ds in types]
+
+_fields = ['f%d: %s' % (i, m) for i, m in
+           enumerate(['int32', '?float64', 'string', 'datetime',
+                      '3 * int8', '{x: float32, y: float32}'] * 50)]
+records = {
+    'small': 'var * {name: string, amount: int64}',
+    'large': 'var * {%s}' % ', '.join(_fields),
+}
+
+
+def time_lex():
+    for s in corpus:
+        list(lexer.lex(s))
+
+
+def time_tokenize():
+    for s in corpus:
+        lexer.tokenize(s)
+
+
+def time_parse():
+    # Goes around the dshape() cache
+    for s in corpus:
+        parser.parse(s, sym)
+
+
+def time_dshape(name):
+    clear_cache()
+    dshape(records[name])
+time_dshape.params = sorted(records)
+time_dshape.param_names = ['record']
+
+
+def time_dshape_cached(name):
+    dshape(records[name])
+time_dshape_cached.params = sorted(records)
+time_dshape_cached.param_names = ['record']
+
+
+def time_str():
+    for ds in types:
+        str(ds)
+
+
+def time_repr():
+    for ds in types:
+        repr(ds)
+
+
+def time_dumps():
+    for ds in types:
+        serialization.dumps(ds)
+
+
+def time_loads():
+    # Goes around the loads() cache
+    serialization.loads_cache.clear()
+    for data in encoded:
+        serialization.loads(data)
+
+
+def time_pickle():
+    for ds in types:
+        pickle.loads(pickle.dumps(ds, pickle.HIGHEST_PROTOCOL))
+
+
+if __name__ == '__main__':
+    print('%d datashapes, %d characters' % (len(corpus), size))
+    for func in (time_lex, time_tokenize, time_parse, time_str, time_repr,
+                 time_dumps, time_loads, time_pickle):
+        n = 200
+        t = min(timeit.repeat(func, number=n, repeat=5)) / n
+        print('%-14s %8.1f us/corpus %8.2f MB/s' % (func.__name__[5:],
+                                                   t * 1e6, size / t / 1e6))
+    print()
+    for name in sorted(records):
+        for func in (time_dshape, time_dshape_cached):
+            n = 20
+            t = min(timeit.repeat(lambda: func(name), number=n, repeat=5)) / n
+            print('%-20s %-6s %10.1f us' % (func.__name__[5:], name, t * 1e6))
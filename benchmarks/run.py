@@ -0,0 +1,151 @@
+"""
+Offline runner for the benchmark suite.
+
+Collects the ``time_*`` and ``track_*`` functions of the benchmark
+modules, with their ``params`` and ``param_names``, the way asv does,
+so the suite can be run without asv or a network connection::
+
+    python -m benchmarks.run                    # everything
+    python -m benchmarks.run -b parsing -b validate
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+With ``--compare``, each result is shown next to the baseline, and the
+exit status is 1 if any benchmark got slower (or any tracked value got
+larger) by more than ``--factor``.  The committed baseline was taken on
+one particular machine, so regenerate it with ``--save`` before
+comparing on another one.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import argparse
+import importlib
+import inspect
+import json
+import pkgutil
+import platform
+import re
+import sys
+import timeit
+from itertools import product
+
+import benchmarks
+
+
+def benchmark_modules():
+    return sorted(name for _, name, _ in pkgutil.iter_modules(
+                  benchmarks.__path__) if name != 'run')
+
+
+def collect(patterns=()):
+    """
+    Yields ``(name, func, args)`` for every benchmark, and every
+    combination of its parameters, matching one of ``patterns``.
+    """
+    for modname in benchmark_modules():
+        module = importlib.import_module('benchmarks.' + modname)
+        for attr, func in sorted(vars(module).items()):
+            if (not attr.startswith(('time_', 'track_')) or
+                    not inspect.isfunction(func) or
+                    func.__module__ != module.__name__):
+                continue
+            params = getattr(func, 'params', None)
+            if params is None:
+                combos = [()]
+            elif len(getattr(func, 'param_names', ())) > 1:
+                combos = list(product(*params))
+            else:
+                combos = [(p,) for p in params]
+            for args in combos:
+                name = '%s.%s' % (modname, attr)
+                if args:
+                    name += '(%s)' % ', '.join(map(str, args))
+                if not patterns or any(re.search(p, name) for p in patterns):
+                    yield name, func, args
+
+
+def time_benchmark(func, args, repeat=5, min_time=0.02):
+    """ Best time of one call, in seconds """
+    timer = timeit.Timer(lambda: func(*args))
+    number = 1
+    while True:
+        t = timer.timeit(number)
+        if t >= min_time or number >= 10 ** 6:
+            break
+        number *= 10
+    return min([t] + timer.repeat(repeat - 1, number)) / number
+
+
+def run(patterns=(), repeat=5):
+    results = {}
+    for name, func, args in collect(patterns):
+        if func.__name__.startswith('time_'):
+            value, unit = time_benchmark(func, args, repeat), 'seconds'
+        else:
+            value, unit = func(*args), getattr(func, 'unit', 'unit')
+        results[name] = {'value': value, 'unit': unit}
+        yield name, results[name]
+
+
+def format_value(value, unit):
+    if unit != 'seconds':
+        return '%.4g %s' % (value, unit)
+    for scale, suffix in ((1e-6, 'ns'), (1e-3, 'us'), (1, 'ms')):
+        if value < scale:
+            return '%.4g %s' % (value / scale * 1e3, suffix)
+    return '%.4g s' % value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run the datashape benchmarks.')
+    parser.add_argument('-b', '--bench', action='append', default=[],
+                        help='regex selecting benchmarks, may be repeated')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='write the results to this file')
+    parser.add_argument('--compare', help='baseline results to compare to')
+    parser.add_argument('--factor', type=float, default=2.0,
+                        help='ratio to the baseline counted as a regression')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results, regressions = {}, []
+    for name, result in run(args.bench, args.repeat):
+        results[name] = result
+        line = '%-60s %14s' % (name, format_value(result['value'],
+                                                  result['unit']))
+        old = baseline.get(name)
+        if old is not None and old['value']:
+            ratio = result['value'] / old['value']
+            line += '  %6.2fx' % ratio
+            if ratio > args.factor:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line)
+        sys.stdout.flush()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'machine': {'python': platform.python_version(),
+                                   'platform': platform.platform(),
+                                   'processor': platform.processor()},
+                       'results': results},
+                      f, indent=1, sort_keys=True)
+            f.write('\n')
+
+    if regressions:
+        print('\n%d benchmark(s) regressed by more than %gx:' %
+              (len(regressions), args.factor))
+        for name in regressions:
+            print('  ' + name)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Speed of validating Python data against a datashape.
+
+The benchmarks follow the asv conventions and can also be run
+directly with ``python -m benchmarks.validation``.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import timeit
+
+from datashape import dshape
+from datashape.user import (validate, compile_validator, invalid_rows,
+                            validate_rows, issubschema, issubschema_cache)
+
+import numpy as np
+
+
+cases = {
+    'matrix': (dshape('1000 * 10 * float64'),
+               [[float(i)] * 10 for i in range(1000)]),
+    'ragged': (dshape('var * var * int64'),
+               [list(range(i % 20)) for i in range(1000)]),
+    'records': (dshape('var * {name: string, amount: int64, score: float64}'),
+                [{'name': 'Alice', 'amount': i, 'score': 0.5}
+                 for i in range(1000)]),
+    'tuples': (dshape('var * {name: string, amount: int64, score: float64}'),
+               [('Alice', i, 0.5) for i in range(1000)]),
+}
+
+
+def time_validate(name):
+    schema, data = cases[name]
+    validate(schema, data)
+time_validate.params = sorted(cases)
+time_validate.param_names = ['data']
+
+
+# One row in a hundred is bad
+bad_rows = [{'name': 'Alice', 'amount': i, 'score': 0.5} if i % 100 else
+            {'name': None, 'amount': str(i), 'score': 0.5}
+            for i in range(10000)]
+
+
+def time_validate_rows():
+    validate_rows(cases['records'][0], bad_rows)
+
+
+n = 100000
+arrays = {
+    'int64 to int32': (dshape('var * int32'), np.arange(n)),
+    'float with nulls': (dshape('var * ?float32'),
+                         np.where(np.arange(n) % 10, 1.5, np.nan)),
+    'records': (dshape('var * {id: int64, x: float64, flag: bool}'),
+                np.zeros(n, dtype=[('id', 'i8'), ('x', 'f8'),
+                                   ('flag', '?')])),
+    'matrix': (dshape('var * 10 * float64'), np.ones((n // 10, 10))),
+}
+
+
+def time_invalid_rows(name):
+    invalid_rows(*arrays[name])
+time_invalid_rows.params = sorted(arrays)
+time_invalid_rows.param_names = ['array']
+
+
+validators = dict((name, compile_validator(schema))
+                  for name, (schema, data) in cases.items())
+
+
+def time_compiled_validator(name):
+    validators[name](cases[name][1])
+time_compiled_validator.params = sorted(cases)
+time_compiled_validator.param_names = ['data']
+
+
+subschemas = (dshape('var * {id: int32, name: string[20, "A"], x: ?float32,'
+                     ' tags: 3 * int8}'),
+              dshape('var * {id: int64, x: ?float64, tags: var * int16}'))
+
+
+def time_issubschema():
+    issubschema(*subschemas)
+
+
+def time_issubschema_uncached():
+    issubschema_cache.clear()
+    issubschema(*subschemas)
+
+
+if __name__ == '__main__':
+    print('%-10s %8s %14s %14s' % ('data', 'valid', 'validate (ms)',
+                                   'compiled (ms)'))
+    for name in sorted(cases):
+        times = []
+        for func in (time_validate, time_compiled_validator):
+            n = 5
+            t = min(timeit.repeat(lambda: func(name), number=n, repeat=3))
+            times.append(t / n * 1e3)
+        print('%-10s %8s %14.2f %14.2f' % ((name, validate(*cases[name])) +
+                                           tuple(times)))
+
+    print()
+    t = min(timeit.repeat(time_validate_rows, number=5, repeat=3))
+    print('validate_rows, %d rows: %d errors in %.2f ms' % (
+        len(bad_rows), len(validate_rows(cases['records'][0], bad_rows)),
+        t / 5 * 1e3))
+
+    print()
+    print('%-18s %10s %16s' % ('array', 'invalid', 'invalid_rows (ms)'))
+    for name in sorted(arrays):
+        t = min(timeit.repeat(lambda: time_invalid_rows(name), number=5,
+                              repeat=3))
+        print('%-18s %10d %16.2f' % (name, invalid_rows(*arrays[name]).sum(),
+                                     t / 5 * 1e3))
@@ -1,19 +1,94 @@
 from __future__ import absolute_import
 
+import sys
+
 from . import lexer, parser
-from . import type_equation_solver
+from . import coretypes, predicates, typesets, type_symbol_table, util
 from .coretypes import *
 from .predicates import *
 from .typesets import *
-from .user import *
 from .type_symbol_table import *
-from .overload_resolver import *
-from .discovery import discover
 from .util import *
-from .coercion import coercion_cost
 from .error import (DataShapeSyntaxError, OverloadError, UnificationError,
                     CoercionError)
 
+# Names loaded from their submodule on first access, so that parsing
+# datashapes does not pay for importing numpy, dateutil, multipledispatch
+# and the coercion tables.  These submodules export their whole __all__,
+# repeated here so that it is known without importing them; the copies
+# are checked against the submodules by TestLazyImports.
+_lazy_all = {
+    '.user': ['validate', 'issubschema', 'compile_validator',
+              'invalid_rows', 'validate_rows', 'RowError'],
+    '.overload_resolver': ['OverloadResolver'],
+}
+# While these only export some of their names
+_lazy_some = {
+    '.discovery': ['discover'],
+    '.coercion': ['coercion_cost'],
+}
+_lazy_attributes = dict((name, (module, name))
+                        for exports in (_lazy_all, _lazy_some)
+                        for module, names in exports.items()
+                        for name in names)
+_lazy_attributes['np'] = ('numpy', None)
+_lazy_submodules = set(['coercion', 'discovery', 'dispatch', 'overload_resolver',
+                        'promotion', 'type_equation_solver', 'user'])
+
+
+def _import(module):
+    """ Import a module, relative to this package if it starts with a dot """
+    # Python 2.6 has no importlib
+    if module.startswith('.'):
+        module = __name__ + module
+    __import__(module)
+    return sys.modules[module]
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        module, attr = _lazy_attributes[name]
+        value = _import(module)
+        if attr is not None:
+            value = getattr(value, attr)
+        globals()[name] = value
+        return value
+    if name in _lazy_submodules:
+        return _import('.' + name)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes) | _lazy_submodules)
+
+
+if sys.version_info < (3, 7):
+    # No module __getattr__ (PEP 562), load everything up front
+    for _name in list(_lazy_attributes) + list(_lazy_submodules):
+        globals()[_name] = __getattr__(_name)
+
+
+def _public_names(module):
+    """ The names ``from module import *`` binds, less imported modules """
+    import __future__
+    from types import ModuleType
+    names = getattr(module, '__all__', None)
+    if names is None:
+        names = [name for name, value in vars(module).items()
+                 if not name.startswith('_') and
+                 not isinstance(value, (ModuleType, __future__._Feature))]
+    return list(names)
+
+
+# ``from datashape import *`` loads the lazy names too
+__all__ = sorted(set(['lexer', 'parser', 'DataShapeSyntaxError',
+                      'OverloadError', 'UnificationError', 'CoercionError',
+                      'test'] +
+                     [name for module in (coretypes, predicates, typesets,
+                                          type_symbol_table, util)
+                      for name in _public_names(module)] +
+                     [name for name in _lazy_attributes if name != 'np']))
+
 __version__ = '0.2.1dev'
 
 def test(verbosity=1, xunitfile=None, exit=False):
@@ -7,7 +7,11 @@ to figure out whether this is possible in the face of polymorphic overloads.
 
 from __future__ import absolute_import, division, print_function
 
-from collections import defaultdict
+import threading
+import warnings
+from functools import partial
+
+import numpy as np
 
 from .error import CoercionError
 from .coretypes import CType, TypeVar, Mono
@@ -19,61 +23,168 @@ inf = float('inf')
 
 
 class CoercionTable(object):
-    """Table to hold coercion rules"""
+    """Table to hold coercion rules
 
-    def __init__(self):
-        self.table = {}
-        self.srcs = defaultdict(set)
-        self.dsts = defaultdict(set)
+    Lookups go through a dense matrix of the cheapest coercion costs
+    between all pairs of types, indexed by the position of each type
+    in ``types``.  It is computed from the rules with Floyd-Warshall
+    the first time it is needed after a rule is added.
+
+    Rules costing ``lossy_cost`` or more are the ones which may lose
+    information, and coercions made only of cheaper transitive rules
+    are lossless.
+    """
 
-    def _reflexivity(self, a):
-        if (a, a) not in self.table:
-            self.table[a, a] = 0
+    lossy_cost = 1.5
+
+    def __init__(self):
+        self.rules = []
+        self._matrix = None
 
     def add_coercion(self, src, dst, cost, transitive=True):
         """
         Add a coercion rule
         """
         assert cost >= 0, 'Raw coercion costs must be nonnegative'
-        if (src, dst) not in self.table:
-            self.srcs[dst].add(src)
-            self.dsts[src].add(dst)
-            self._reflexivity(src)
-            self._reflexivity(dst)
-            if src != dst:
-                self.table[src, dst] = cost
-                if transitive:
-                    transitivity(src, dst, self)
-        else:
-            # Add the cost for the shortest path for the coercion
-            self.table[src, dst] = min(self.table[src, dst], cost)
+        self.rules.append((src, dst, cost, transitive))
+        self._matrix = None
+
+    def _build_matrix(self):
+        types = []
+        for src, dst, _, _ in self.rules:
+            for t in (src, dst):
+                if t not in types:
+                    types.append(t)
+        ids = dict((t, i) for i, t in enumerate(types))
+        # One extra row and column of inf for types without rules
+        n = len(types)
+        matrix = np.empty((n + 1, n + 1))
+        matrix.fill(inf)
+        matrix[np.arange(n), np.arange(n)] = 0
+        for src, dst, cost, transitive in self.rules:
+            if transitive:
+                i, j = ids[src], ids[dst]
+                matrix[i, j] = min(matrix[i, j], cost)
+        for k in range(n):
+            np.minimum(matrix, matrix[:, k, None] + matrix[None, k, :],
+                       out=matrix)
+        for src, dst, cost, transitive in self.rules:
+            if not transitive:
+                i, j = ids[src], ids[dst]
+                matrix[i, j] = min(matrix[i, j], cost)
+        # Transitive closure of the lossless rules
+        lossless = np.eye(n + 1, dtype=bool)
+        for src, dst, cost, transitive in self.rules:
+            if transitive and cost < self.lossy_cost:
+                lossless[ids[src], ids[dst]] = True
+        for k in range(n):
+            lossless |= lossless[:, k, None] & lossless[None, k, :]
+        self.types, self.ids = types, ids
+        self._rows = matrix.tolist()
+        self._lossless_rows = lossless.tolist()
+        # Set last, lookups only check this to know the rest is built
+        self._matrix = matrix
+
+    @property
+    def matrix(self):
+        """
+        ``matrix[i, j]`` is the cost of coercing ``types[i]`` to
+        ``types[j]``, inf if there is no coercion.
+        """
+        if self._matrix is None:
+            self._build_matrix()
+        return self._matrix
+
+    @property
+    def table(self):
+        """
+        Deprecated, the costs of all possible coercions as a dict keyed
+        on ``(src, dst)``.  Use ``coercion_cost`` or ``matrix`` instead.
+        """
+        warnings.warn('CoercionTable.table is deprecated, use '
+                      'coercion_cost or matrix instead',
+                      DeprecationWarning, stacklevel=2)
+        rows, types = self.matrix.tolist(), self.types
+        return dict(((src, dst), rows[i][j])
+                    for i, src in enumerate(types)
+                    for j, dst in enumerate(types) if rows[i][j] != inf)
 
     def coercion_cost(self, src, dst):
         """
         Determine a coercion cost for coercing type `a` to type `b`
         """
-        return self.table[src, dst]
+        if self._matrix is None:
+            self._build_matrix()
+        cost = self._rows[self.ids[src]][self.ids[dst]]
+        if cost == inf:
+            raise KeyError((src, dst))
+        return cost
+
+    def lossless(self, src, dst):
+        """
+        Whether coercing type ``src`` to ``dst`` never loses information
+        """
+        if src == dst:
+            return True
+        if self._matrix is None:
+            self._build_matrix()
+        i, j = self.ids.get(src), self.ids.get(dst)
+        return i is not None and j is not None and self._lossless_rows[i][j]
+
+    def coercion_cost_matrix(self, srcs, dsts):
+        """
+        Costs of coercing each of ``srcs`` to each of ``dsts`` as a
+        ``len(srcs) x len(dsts)`` array, with inf where there is no
+        coercion.
+        """
+        matrix = self.matrix
+        src_ids = [self.ids.get(t, -1) for t in srcs]
+        dst_ids = [self.ids.get(t, -1) for t in dsts]
+        result = matrix[np.ix_(src_ids, dst_ids)]
+        # Types without rules can still be coerced to themselves
+        for i, src in enumerate(srcs):
+            if src_ids[i] < 0:
+                for j, dst in enumerate(dsts):
+                    if src == dst:
+                        result[i, j] = 0
+        return result
+
+
+class DefaultCoercionTable(CoercionTable):
+    """Coercion table which adds the default rules on first use
+
+    Adding the default rules is left out of ``import datashape``, and
+    only done once the table is needed.
+    """
 
+    def __init__(self):
+        super(DefaultCoercionTable, self).__init__()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load_defaults(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    _add_default_rules(partial(CoercionTable.add_coercion,
+                                               self))
+                    self._loaded = True
 
-_table = CoercionTable()
-add_coercion = _table.add_coercion
-coercion_cost_table = _table.coercion_cost
+    def add_coercion(self, src, dst, cost, transitive=True):
+        self._load_defaults()
+        super(DefaultCoercionTable, self).add_coercion(src, dst, cost,
+                                                       transitive)
 
-#------------------------------------------------------------------------
-# Coercion invariants
-#------------------------------------------------------------------------
+    def _build_matrix(self):
+        self._load_defaults()
+        super(DefaultCoercionTable, self)._build_matrix()
 
-def transitivity(a, b, table=_table):
-    """Enforce coercion rule transitivity"""
-    # (src, a) in R and (a, b) in R => (src, b) in R
-    for src in table.srcs[a]:
-        table.add_coercion(src, b, table.coercion_cost(src, a) +
-                                   table.coercion_cost(a, b))
 
-    # (a, b) in R and (b, dst) in R => (a, dst) in R
-    for dst in table.dsts[b]:
-        table.add_coercion(a, dst, table.coercion_cost(a, b) +
-                                   table.coercion_cost(b, dst))
+_table = DefaultCoercionTable()
+add_coercion = _table.add_coercion
+coercion_cost_table = _table.coercion_cost
+coercion_cost_matrix = _table.coercion_cost_matrix
+lossless_coercion = _table.lossless
 
 #------------------------------------------------------------------------
 # Coercion function
@@ -206,46 +317,51 @@ def termsize(term):
 # Default coercion rules
 #------------------------------------------------------------------------
 
-def add_numeric_rule(types, cost=1):
+def add_numeric_rule(types, cost=1, add_coercion=add_coercion):
     types = list(types)
     for src, dst in zip(types[:-1], types[1:]):
         add_coercion(src, dst, cost)
 
-add_numeric_rule(signed)
-add_numeric_rule(unsigned)
-add_numeric_rule(floating)
-add_numeric_rule(complexes)
 
-add_numeric_rule([coretypes.uint8, coretypes.int16])
-add_numeric_rule([coretypes.uint16, coretypes.int32])
-add_numeric_rule([coretypes.uint32, coretypes.int64])
+def _add_default_rules(add_coercion):
+    rule = partial(add_numeric_rule, add_coercion=add_coercion)
+
+    rule(signed)
+    rule(unsigned)
+    rule(floating)
+    rule(complexes)
+
+    rule([coretypes.uint8, coretypes.int16])
+    rule([coretypes.uint16, coretypes.int32])
+    rule([coretypes.uint32, coretypes.int64])
 
-add_numeric_rule([coretypes.int16, coretypes.float32], 1.2)
-add_numeric_rule([coretypes.int32, coretypes.float64], 1.2)
-add_numeric_rule([coretypes.float32, coretypes.complex_float32], 1.2)
-add_numeric_rule([coretypes.float64, coretypes.complex_float64], 1.2)
+    rule([coretypes.int16, coretypes.float32], 1.2)
+    rule([coretypes.int32, coretypes.float64], 1.2)
+    rule([coretypes.float32, coretypes.complex_float32], 1.2)
+    rule([coretypes.float64, coretypes.complex_float64], 1.2)
 
-# Potentially lossy conversions
+    # Potentially lossy conversions
 
-# unsigned -> signed
-add_numeric_rule([coretypes.uint8, coretypes.int8], 1.5)
-add_numeric_rule([coretypes.uint16, coretypes.int16], 1.5)
-add_numeric_rule([coretypes.uint32, coretypes.int32], 1.5)
-add_numeric_rule([coretypes.uint64, coretypes.int64], 1.5)
+    # unsigned -> signed
+    rule([coretypes.uint8, coretypes.int8], 1.5)
+    rule([coretypes.uint16, coretypes.int16], 1.5)
+    rule([coretypes.uint32, coretypes.int32], 1.5)
+    rule([coretypes.uint64, coretypes.int64], 1.5)
 
-# signed -> unsigned
-add_numeric_rule([coretypes.int8, coretypes.uint8], 1.5)
-add_numeric_rule([coretypes.int16, coretypes.uint16], 1.5)
-add_numeric_rule([coretypes.int32, coretypes.uint32], 1.5)
-add_numeric_rule([coretypes.int64, coretypes.uint64], 1.5)
+    # signed -> unsigned
+    rule([coretypes.int8, coretypes.uint8], 1.5)
+    rule([coretypes.int16, coretypes.uint16], 1.5)
+    rule([coretypes.int32, coretypes.uint32], 1.5)
+    rule([coretypes.int64, coretypes.uint64], 1.5)
 
-# int -> float
-add_numeric_rule([coretypes.int32, coretypes.float32], 1.5)
-add_numeric_rule([coretypes.int64, coretypes.float64], 1.5)
+    # int -> float
+    rule([coretypes.int32, coretypes.float32], 1.5)
+    rule([coretypes.int64, coretypes.float64], 1.5)
 
-# float -> complex
-add_numeric_rule([coretypes.float64, coretypes.complex_float32], 1.5)
+    # float -> complex
+    rule([coretypes.float64, coretypes.complex_float32], 1.5)
 
-# Anything -> bool
-for tp in (list(signed) + list(unsigned) + list(floating) + list(complexes)):
-    add_numeric_rule([tp, coretypes.bool_], 1000.)
+    # Anything -> bool
+    for tp in (list(signed) + list(unsigned) + list(floating) +
+               list(complexes)):
+        rule([tp, coretypes.bool_], 1000.)
@@ -9,8 +9,14 @@ shape and data type.
 import ctypes
 import datetime
 import operator
+import re
+import sys
+import weakref
 
-import numpy as np
+try:
+    from copyreg import _slotnames, __newobj__
+except ImportError:
+    from copy_reg import _slotnames, __newobj__
 
 from .py2help import _inttypes, _strtypes, unicode
 from .internal_utils import IndexCallable
@@ -56,28 +62,61 @@ class Mono(object):
 
     composite = False
     __metaclass__ = Type
+    # Subclasses list their parameters in their own __slots__, or store
+    # them in a _parameters slot and use _stored_parameters.  Only the hash is
+    # cached on every type, the composite types also have slots for
+    # their string form (_str) and for being interned (_interned).
+    __slots__ = '_hash', '__weakref__'
 
     def __init__(self, *params):
-        self._parameters = params
+        if params:
+            self._parameters = params
 
     @property
     def parameters(self):
-        if hasattr(self, '__slots__'):
-            return tuple(getattr(self, slot) for slot in self.__slots__)
-        else:
-            return self._parameters
+        # Not stored, to keep the leaf types small
+        return tuple(getattr(self, slot) for slot in self.__slots__)
 
     def info(self):
         return type(self), self.parameters
 
     def __eq__(self, other):
+        if self is other:
+            return True
+        # Interned types are canonical, so distinct ones are never equal
+        if (getattr(self, '_interned', False) and
+                getattr(other, '_interned', False)):
+            return False
         return type(self) == type(other) and self.info() == other.info()
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
-        return hash(self.info())
+        try:
+            return self._hash
+        except AttributeError:
+            h = self._hash = hash(self.info())
+            return h
+
+    def __getstate__(self):
+        # The cached hash, string and interning flag are not part of the
+        # value
+        state = dict((name, getattr(self, name))
+                     for name in _slotnames(type(self))
+                     if name not in ('_hash', '_interned', '_str') and
+                        hasattr(self, name))
+        return None, state
+
+    def __reduce__(self):
+        # Pickled through the binary encoding, which is much smaller than
+        # the instance state, and unpickled to the interned instance
+        if not (isinstance(self, DataShape) and self.name):
+            try:
+                return _unpickle_type, (self.to_bytes(),)
+            except TypeError:
+                pass
+        return __newobj__, (type(self),), self.__getstate__()
 
     @property
     def shape(self):
@@ -97,6 +136,32 @@ class Mono(object):
         return '%s(%s)' % (type(self).__name__,
                            ", ".join(map(repr, self.parameters)))
 
+    def to_bytes(self):
+        """
+        Encodes the type in the compact binary format of
+        ``datashape.serialization``.
+        """
+        from .serialization import dumps
+        return dumps(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Decodes a type encoded by ``to_bytes``.
+
+        >>> ds = DataShape(Fixed(3), int32)
+        >>> Mono.from_bytes(ds.to_bytes()) == ds
+        True
+        """
+        from .serialization import loads
+        ds = loads(data)
+        if not isinstance(ds, cls):
+            raise TypeError('Serialized type %s is not a %s' %
+                            (type(ds).__name__, cls.__name__))
+        if _interning:
+            ds = intern_type(ds)
+        return ds
+
     # Form for searching signature in meta-method Dispatch Table
     def sigform(self):
         return self
@@ -142,6 +207,19 @@ class Unit(Mono):
     """
     Unit type that does not need to be reconstructed.
     """
+    __slots__ = ()
+
+
+def _stored_parameters(self):
+    return self._parameters
+
+
+class _Composite(Mono):
+    """
+    Type made of other types, which caches its string form and is
+    compared by identity once interned.
+    """
+    __slots__ = '_interned', '_str'
 
 
 class Ellipsis(Mono):
@@ -171,6 +249,8 @@ class Null(Unit):
     """
     The null datashape.
     """
+    __slots__ = ()
+
     def __str__(self):
         return expr_string('null', None)
 
@@ -243,6 +323,7 @@ class Date(Unit):
         return 'date'
 
     def to_numpy_dtype(self):
+        import numpy as np
         return np.dtype('datetime64[D]')
 
 
@@ -283,6 +364,7 @@ class DateTime(Unit):
             return 'datetime[tz=%r]' % self.tz
 
     def to_numpy_dtype(self):
+        import numpy as np
         return np.dtype('datetime64[us]')
 
 
@@ -399,18 +481,21 @@ class String(Unit):
                             (self.fixlen, repr(self.encoding).strip('u'))
 
     def __repr__(self):
-        return ''.join(["ctype(\"", str(self).encode('unicode_escape').decode('ascii'), "\")"])
+        return _quoted('ctype', str(self))
 
     def to_numpy_dtype(self):
+        import numpy as np
         return np.dtype('O')
 
 
-class DataShape(Mono):
+class DataShape(_Composite):
     """The DataShape class, implementation for generic composite
     datashape objects"""
 
     __metaclass__ = Type
-    composite = False
+    __slots__ = 'name', '_parameters'
+    parameters = property(_stored_parameters)
+    composite = True
 
     def __init__(self, *parameters, **kwds):
         if len(parameters) > 0:
@@ -427,7 +512,6 @@ class DataShape(Mono):
         else:
             raise ValueError(('the data shape should be constructed from 2 or'
                             ' more parameters, only got %s') % (len(parameters)))
-        self.composite = True
 
         name = kwds.get('name')
         if name:
@@ -448,17 +532,18 @@ class DataShape(Mono):
         return self.parameters[index]
 
     def __str__(self):
-        if self.name:
-            res = self.name
-        else:
-            res = (' * '.join(map(str, self.parameters)))
-
-        return res
+        try:
+            return self._str
+        except AttributeError:
+            if self.name:
+                res = self.name
+            else:
+                res = (' * '.join(map(str, self.parameters)))
+            self._str = res
+            return res
 
     def __repr__(self):
-        return ''.join(["dshape(\"",
-                        str(self).encode('unicode_escape').decode('ascii'),
-                        "\")"])
+        return _quoted('dshape', str(self))
 
     @property
     def shape(self):
@@ -574,7 +659,7 @@ class DataShape(Mono):
         raise NotImplementedError()
 
 
-class Option(Mono):
+class Option(_Composite):
     """
     Measure types which may or may not hold data. Makes no
     indication of how this is implemented in memory.
@@ -592,7 +677,11 @@ class Option(Mono):
         return self.ty.shape
 
     def __str__(self):
-        return '?%s' % str(self.ty)
+        try:
+            return self._str
+        except AttributeError:
+            res = self._str = '?%s' % str(self.ty)
+            return res
 
     def __repr__(self):
         return str(self)
@@ -643,6 +732,7 @@ class CType(Unit):
         """
         To Numpy dtype.
         """
+        import numpy as np
         # Fixup the complex type to how numpy does it
         s = self.name
         s = {'complex[float32]':'complex64',
@@ -653,7 +743,7 @@ class CType(Unit):
         return self.name
 
     def __repr__(self):
-        return ''.join(["ctype(\"", str(self).encode('unicode_escape').decode('ascii'), "\")"])
+        return _quoted('ctype', str(self))
 
 
 class Fixed(Unit):
@@ -726,6 +816,8 @@ class Implements(Mono):
     Type representing a constraint on the subtype term (which must be a
     TypeVar), namely that it must belong to a given type set.
     """
+    __slots__ = '_parameters',
+    parameters = property(_stored_parameters)
 
     @property
     def typevar(self):
@@ -739,10 +831,13 @@ class Implements(Mono):
         return '%s : %s' % (self.typevar, self.typeset.name)
 
 
-class Function(Mono):
+class Function(_Composite):
     """
     Used for function signatures.
     """
+    __slots__ = '_parameters',
+    parameters = property(_stored_parameters)
+
     def __init__(self, *parameters):
         self._parameters = parameters
 
@@ -758,15 +853,21 @@ class Function(Mono):
     #     return " -> ".join(map(repr, self.parameters))
 
     def __str__(self):
-        return ('(' + ', '.join(map(str, self.parameters[:-1])) +
-                ') -> ' + str(self.parameters[-1]))
+        try:
+            return self._str
+        except AttributeError:
+            args = ', '.join(map(str, self.parameters[:-1]))
+            res = self._str = '(%s) -> %s' % (args, self.parameters[-1])
+            return res
 
 
-class Record(Mono):
+class Record(_Composite):
     """
     A composite data structure of ordered fields mapped to types.
     """
     cls = MEASURE
+    __slots__ = '__fnames', '__ftypes', '__fdict', '_parameters'
+    parameters = property(_stored_parameters)
 
     def __init__(self, fields):
         """
@@ -784,9 +885,9 @@ class Record(Mono):
                          for n, t in fields]
         self.__ftypes = [t if isinstance(t, DataShape) else DataShape(t)
                          for t in ftypes]
-        self.__fields = tuple(zip(self.__fnames, self.__ftypes))
-        self.__fdict = dict(self.__fields)
-        self._parameters = (self.__fields,)
+        fields = tuple(zip(self.__fnames, self.__ftypes))
+        self.__fdict = dict(fields)
+        self._parameters = (fields,)
 
     @property
     def fields(self):
@@ -804,6 +905,7 @@ class Record(Mono):
         """
         To Numpy record dtype.
         """
+        import numpy as np
         dk = self.__fnames
         dv = map(to_numpy_dtype, self.__ftypes)
         return np.dtype(list(zip(dk, dv)))
@@ -812,13 +914,17 @@ class Record(Mono):
         return self.__fdict[key]
 
     def __str__(self):
-        return record_string(self.__fnames, self.__ftypes)
+        try:
+            return self._str
+        except AttributeError:
+            res = self._str = record_string(self.__fnames, self.__ftypes)
+            return res
 
     def __repr__(self):
-        return ''.join(["dshape(\"", str(self).encode('unicode_escape').decode('ascii'), "\")"])
+        return _quoted('dshape', str(self))
 
 
-class Tuple(Mono):
+class Tuple(_Composite):
     """
     A product type.
     """
@@ -837,10 +943,14 @@ class Tuple(Mono):
         self.dshapes = tuple(dshapes)
 
     def __str__(self):
-        return '(' + ', '.join(str(x) for x in self.dshapes) + ')'
+        try:
+            return self._str
+        except AttributeError:
+            res = self._str = '(' + ', '.join(map(str, self.dshapes)) + ')'
+            return res
 
     def __repr__(self):
-        return ''.join(["dshape(\"", str(self).encode('unicode_escape').decode('ascii'), "\")"])
+        return _quoted('dshape', str(self))
 
 
 class JSON(Mono):
@@ -855,6 +965,90 @@ class JSON(Mono):
         return 'json'
 
 
+#------------------------------------------------------------------------
+# Interning
+#------------------------------------------------------------------------
+
+# Canonical instances keyed on (type, interned parameters)
+_intern_table = weakref.WeakValueDictionary()
+_interning = False
+
+
+def set_interning(enabled):
+    """
+    Turn interning of the types returned by ``dshape`` on or off,
+    returning the previous setting.
+    """
+    global _interning
+    previous, _interning = _interning, bool(enabled)
+    return previous
+
+
+def interning_enabled():
+    """Whether ``dshape`` returns interned types."""
+    return _interning
+
+
+def _intern_param(p):
+    if isinstance(p, Mono):
+        return intern_type(p)
+    elif isinstance(p, (tuple, list)):
+        interned = [_intern_param(x) for x in p]
+        if all(a is b for a, b in zip(interned, p)):
+            return p
+        return type(p)(interned)
+    return p
+
+
+def _unpickle_type(data):
+    from .serialization import loads
+    return intern_type(loads(data))
+
+
+def intern_type(ds):
+    """
+    Return the canonical instance of a type (hash-consing).
+
+    Structurally equal types intern to the same object, so equality of
+    interned types is an identity check and their hash is computed once.
+
+    >>> intern_type(DataShape(Fixed(10), int32)) is \\
+    ...     intern_type(DataShape(Fixed(10), int32))
+    True
+    >>> from numpy import dtype
+    >>> intern_type(CType.from_numpy_dtype(dtype('int32'))) is int32
+    True
+    """
+    if not isinstance(ds, Mono) or getattr(ds, '_interned', False):
+        return ds
+    # A named datashape is a distinct registered entity
+    if isinstance(ds, DataShape) and ds.name:
+        return ds
+    # Look the type up as it is first, equal parameters hash the same
+    # whether or not they are interned
+    canonical = _intern_table.get((type(ds), ds.parameters))
+    if canonical is not None:
+        return canonical
+    params = ds.parameters
+    # Units are leaves, their parameters need not be reconstructable
+    if not isinstance(ds, Unit):
+        interned = _intern_param(params)
+        if interned is not params:
+            ds = type(ds)(*interned)
+            params = interned
+    key = type(ds), params
+    canonical = _intern_table.get(key)
+    if canonical is None:
+        canonical = _intern_table.setdefault(key, ds)
+        # Only flag the instance which won the table entry, another
+        # thread may have interned an equal one in the meantime
+        if canonical is ds:
+            ds._hash = hash(key)
+            if isinstance(ds, _Composite):
+                ds._interned = True
+    return canonical
+
+
 bool_ = CType('bool', 1, 1)
 char = CType('char', 1, 1)
 
@@ -958,6 +1152,14 @@ Type.register('string', String())
 
 var = Var()
 
+# Make the builtin instances the canonical ones
+for _ds in [bool_, char, int8, int16, int32, int64, uint8, uint16, uint32,
+            uint64, float16, float32, float64, complex_float32,
+            complex_float64, date_, time_, datetime_, null, void, object_,
+            bytes_, string, json, var, NullRecord]:
+    intern_type(_ds)
+del _ds
+
 
 class NotNumpyCompatible(Exception):
     """
@@ -971,16 +1173,33 @@ def to_numpy_dtype(ds):
     measure as NumPy dtype instance."""
     return to_numpy(ds)[1]
 
+# NumPy (shape, dtype) conversions keyed on the (immutable) datashape,
+# held only as long as the datashape itself
+_numpy_cache = weakref.WeakKeyDictionary()
+
+
 def to_numpy(ds):
     """
     Downcast a datashape object into a Numpy (shape, dtype) tuple if
     possible.
 
+    Conversions are cached, so converting a type again returns the same
+    dtype object.
+
     >>> from datashape import dshape, to_numpy
     >>> to_numpy(dshape('5 * 5 * int32'))
     ((5, 5), dtype('int32'))
     """
+    if not isinstance(ds, Mono):
+        return _to_numpy(ds)
+    try:
+        return _numpy_cache[ds]
+    except KeyError:
+        result = _numpy_cache[ds] = _to_numpy(ds)
+        return result
 
+
+def _to_numpy(ds):
     shape = tuple()
     dtype = None
 
@@ -1008,7 +1227,8 @@ def to_numpy(ds):
     except AttributeError:
         raise NotNumpyCompatible('DataShape measure %s is not NumPy-compatible' % msr)
 
-    if type(dtype) != np.dtype:
+    import numpy as np
+    if not isinstance(dtype, np.dtype):
         raise NotNumpyCompatible('Internal Error: Failed to produce NumPy dtype')
     return (shape, dtype)
 
@@ -1022,6 +1242,7 @@ def from_numpy(shape, dt):
     >>> from_numpy((5, 5), dtype('int32'))
     dshape("5 * 5 * int32")
     """
+    import numpy as np
     dtype = np.dtype(dt)
 
     if dtype.kind == 'S':
@@ -1047,7 +1268,9 @@ def typeof(obj):
     """
     if hasattr(obj, "dshape"):
         return obj.dshape
-    elif isinstance(obj, np.ndarray):
+    elif (sys.modules.get('numpy') is not None and
+          isinstance(obj, sys.modules['numpy'].ndarray)):
+        # Without numpy imported obj can't be an array
         return from_numpy(obj.shape, obj.dtype)
     elif isinstance(obj, _inttypes):
         return DataShape(int_)
@@ -1078,15 +1301,22 @@ def expr_string(spine, const_args, outer=None):
 def record_string(fields, values):
     # Prints out something like this:
     #   {a : int32, b: float32, ... }
-    body = ''
-    count = len(fields)
+    return '{ ' + ', '.join(['%s : %s' % (k, v)
+                             for k, v in zip(fields, values)]) + ' }'
 
-    for i, (k,v) in enumerate(zip(fields,values)):
-        if (i+1) == count:
-            body += '%s : %s' % (k,v)
-        else:
-            body += '%s : %s, ' % (k,v)
-    return '{ ' + body + ' }'
+
+# Any character which unicode_escape would change
+_needs_escape = re.compile(r'[^ -\[\]-~]').search
+
+
+def _quoted(constructor, s):
+    """
+    The repr of a type as a call of ``constructor`` on its string form,
+    with special and non-ASCII characters backslash escaped.
+    """
+    if _needs_escape(s):
+        s = s.encode('unicode_escape').decode('ascii')
+    return ''.join([constructor, '("', s, '")'])
 
 
 def free(ds):
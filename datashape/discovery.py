@@ -1,19 +1,69 @@
 from __future__ import print_function, division, absolute_import
 
+import re
+import random
+from itertools import islice
+
 import numpy as np
 from dateutil.parser import parse as dateparse
 from datetime import datetime, date
-from .dispatch import dispatch
+from .dispatch import dispatch, namespace
 from time import strptime
 
 from .coretypes import (int32, int64, float64, bool_, complex128, datetime_,
                         Option, isdimension, var, from_numpy, Tuple, null,
-                        Record, string, Null, DataShape, real, date_, Mono)
+                        Record, string, Null, DataShape, real, date_, Mono,
+                        Fixed)
 from .py2help import _strtypes
 from .internal_utils import _toposort, groupby
+from multipledispatch import Dispatcher
+
 
+__all__ = ['discover', 'discover_column', 'discover_sample', 'Discoverer']
 
-__all__ = ['discover']
+
+class DiscoverDispatcher(Dispatcher):
+    """ Dispatcher that looks up scalars of common exact types in a table
+
+    ``exact_types`` maps a type to the datashape of every value of exactly
+    that type, and is consulted before dispatching.  Registering a new
+    implementation drops the entries it might override.
+    """
+    def __init__(self, name, doc=None):
+        super(DiscoverDispatcher, self).__init__(name, doc=doc)
+        self.exact_types = {}
+
+    def __call__(self, *args, **kwargs):
+        if len(args) == 1 and not kwargs:
+            ds = self.exact_types.get(type(args[0]))
+            if ds is not None:
+                return ds
+        return Dispatcher.__call__(self, *args, **kwargs)
+
+    def add(self, signature, func):
+        super(DiscoverDispatcher, self).add(signature, func)
+        if len(signature) == 1:
+            for typ in list(self.exact_types):
+                if issubclass(typ, signature[0]):
+                    del self.exact_types[typ]
+
+    def add_exact_types(self, examples):
+        """ Add the types of ``examples`` to the table
+
+        The datashape for each type is whatever dispatch finds for the
+        example, so only pass types whose datashape does not depend on the
+        value.  Types that discover fails on are skipped and keep raising
+        through dispatch.
+        """
+        for example in examples:
+            try:
+                ds = super(DiscoverDispatcher, self).__call__(example)
+            except Exception:
+                continue
+            self.exact_types[type(example)] = ds
+
+
+namespace['discover'] = DiscoverDispatcher('discover')
 
 
 @dispatch(int)
@@ -72,14 +122,23 @@ def discover(s):
 
 
 @dispatch((tuple, list))
-def discover(seq):
+def discover(seq, sample=None, strategy='head', seed=None, executor=None,
+             n_jobs=None):
+    """ Discover the datashape of a list of values or of rows
+
+    Optionally discover only a ``sample`` of the rows, see
+    ``discover_sample``, or discover the columns of the rows in parallel,
+    either on a ``concurrent.futures`` ``executor`` or on a new pool of
+    ``n_jobs`` processes (``-1`` for one per CPU).
+    """
+    if sample is not None:
+        return discover_sample(seq, sample, strategy, seed)[0]
     if (all(isinstance(item, (tuple, list)) for item in seq) and
             len(set(map(len, seq))) == 1):
         columns = list(zip(*seq))
-        unite = do_one([unite_identical, unite_base, unite_merge_dimensions])
         try:
-            types = [unite([discover(dshape) for dshape in column]).subshape[0]
-                                             for column in columns]
+            types = [ds.subshape[0] for ds in
+                     _map_columns(discover_column, columns, executor, n_jobs)]
             unite = do_one([unite_identical, unite_merge_dimensions, Tuple])
             return len(seq) * unite(types)
         except AttributeError: # no subshape available
@@ -90,6 +149,320 @@ def discover(seq):
     return do_one([unite_identical, unite_merge_dimensions, Tuple])(types)
 
 
+def _map_columns(func, columns, executor=None, n_jobs=None):
+    """ ``list(map(func, columns))``, on a pool of workers if asked to """
+    if executor is not None:
+        return list(executor.map(func, columns))
+    if n_jobs is None or n_jobs == 1 or len(columns) < 2:
+        return list(map(func, columns))
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import cpu_count
+    workers = cpu_count() if n_jobs < 0 else n_jobs
+    with ProcessPoolExecutor(workers) as pool:
+        chunksize = max(1, len(columns) // (4 * workers))
+        return list(pool.map(func, columns, chunksize=chunksize))
+
+
+def _sample_head(seq, n, rng):
+    return list(islice(seq, n))
+
+
+def _sample_reservoir(seq, n, rng):
+    """ Uniform sample of ``n`` rows in one pass (Algorithm R) """
+    rows = []
+    for i, row in enumerate(seq):
+        if i < n:
+            rows.append(row)
+        else:
+            j = rng.randint(0, i)
+            if j < n:
+                rows[j] = row
+    return rows
+
+
+def _sample_stratified(seq, n, rng):
+    """ One random row out of each of ``n`` equal slices of ``seq`` """
+    total = len(seq)
+    bounds = [total * i // n for i in range(n + 1)]
+    return [seq[rng.randrange(lo, hi)]
+            for lo, hi in zip(bounds[:-1], bounds[1:]) if lo < hi]
+
+
+sampling_strategies = {'head': _sample_head,
+                       'reservoir': _sample_reservoir,
+                       'stratified': _sample_stratified}
+
+
+def discover_sample(seq, sample, strategy='head', seed=None):
+    """ Discover the datashape of a collection of rows from a sample of them
+
+    Returns a tuple ``(dshape, inspected)`` where ``inspected`` is the
+    number of rows the datashape was inferred from.
+
+    Parameters
+    ----------
+    seq : sequence or iterable
+        The rows.  Only the 'head' and 'reservoir' strategies accept
+        iterables without a length.
+    sample : int
+        The number of rows to inspect.
+    strategy : {'head', 'reservoir', 'stratified'}
+        Inspect the first rows, a uniform random sample of the rows, or
+        one random row out of each of ``sample`` equal slices of the rows.
+    seed : int, optional
+        Seed for the random strategies.
+
+    The leading dimension is the number of rows when it is known, and
+    ``var`` when only the head of an iterable was read.
+
+    >>> discover_sample([(1, 'Alice'), (2, 'Bob'), (3, 'Charlie')], 2)
+    (dshape("3 * (int64, string)"), 2)
+    >>> discover_sample(iter([1, 2, 3]), 2)
+    (dshape("var * int64"), 2)
+    """
+    if sample < 1:
+        raise ValueError('Sample size must be positive, not %d' % sample)
+    try:
+        sampler = sampling_strategies[strategy]
+    except KeyError:
+        raise ValueError('Unknown sampling strategy %r, expected one of %s'
+                         % (strategy, sorted(sampling_strategies)))
+    sized = hasattr(seq, '__len__')
+    if sized and len(seq) <= sample:
+        return discover(list(seq)), len(seq)
+    if strategy == 'stratified' and not sized:
+        raise TypeError('Stratified sampling needs a sequence with a length')
+
+    rng = random.Random(seed)
+    if strategy == 'reservoir' and not sized:
+        # Count the rows as they stream past the reservoir
+        counter = [0]
+
+        def counting(seq):
+            for row in seq:
+                counter[0] += 1
+                yield row
+        rows = sampler(counting(seq), sample, rng)
+        total = counter[0]
+    else:
+        rows = sampler(seq if sized else iter(seq), sample, rng)
+        total = len(seq) if sized else None
+    if total is None and len(rows) < sample:
+        # The iterable ran out before filling the sample
+        total = len(rows)
+
+    ds = discover(rows)
+    if not (isinstance(ds, DataShape) and len(ds) > 1 and
+            ds[0] == Fixed(len(rows))):
+        # The sampled rows did not unite into one type
+        if sized:
+            return discover(list(seq)), len(seq)
+        raise ValueError('Rows sampled from %r do not share a datashape: %s'
+                         % (seq, ds))
+    dim = var if total is None else Fixed(total)
+    return DataShape(dim, *ds.parameters[1:]), len(rows)
+
+
+# Strings which the string coercions in discover certainly accept, in
+# the order discover tries them
+_string_patterns = [
+    (re.compile(r'[+-]?[0-9]+\Z'), int64),
+    (re.compile(r'[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\Z'),
+     float64),
+    (re.compile(r'(?:[Tt]rue|[Ff]alse)\Z'), bool_),
+]
+
+
+def discover_column(values):
+    """ Discover the united datashape of a one dimensional column of values
+
+    Gives the same result as uniting the discovered datashapes of the
+    values the way ``discover`` unites the columns of a list of rows, but
+    each distinct string is classified only once, number- and bool-like
+    strings are classified by regular expressions, and classification
+    stops as soon as the column is known to be a string column.
+
+    Returns None if the values have no common datashape.
+
+    >>> discover_column(['1', '2', '', '3'])
+    dshape("4 * ?int64")
+    >>> discover_column(['Alice', '1', 'Bob'])
+    dshape("3 * string")
+    >>> discover_column(np.array([1.0, 2.0]))
+    dshape("2 * float64")
+    """
+    n = len(values)
+    if not n:
+        return None
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        if values.dtype.kind in 'iufc':
+            return from_numpy(values.shape, values.dtype)
+        elif values.dtype.kind == 'U':
+            values = np.unique(values).tolist()
+    try:
+        uniques = set(values)
+    except TypeError:  # unhashable values
+        uniques = None
+    # Equal numbers of different types, like 1, 1.0 and True, collapse
+    # in a set, so only columns of strings and missing values take the
+    # fast path
+    if uniques is None or not all(v is None or isinstance(v, _strtypes)
+                                  for v in uniques):
+        return _unite_column([discover(v) for v in values])
+
+    nulls = None in uniques or '' in uniques
+    strings = [v for v in uniques if v]
+    types = set()
+    # Classify whole passes of strings by pattern, then fall back to
+    # discover for whatever is left
+    for pattern, ds in _string_patterns:
+        unmatched = [v for v in strings if not pattern.match(v)]
+        if len(unmatched) < len(strings):
+            types.add(ds)
+        strings = unmatched
+    for v in strings:
+        ds = discover(v)
+        types.add(ds)
+        if ds == string:
+            break
+    if not types:
+        return n * null
+    base = lowest_common_dshape(types)
+    if base is None:
+        return None
+    if nulls:
+        base = Option(base)
+    return n * base
+
+
+def _unite_column(dshapes):
+    result = do_one([unite_identical, unite_base,
+                     unite_merge_dimensions])(dshapes)
+    if result is not dshapes:
+        return result
+
+
+class Discoverer(object):
+    """ Discover the datashape of a stream of rows one chunk at a time
+
+    Keeps one running datashape per column and joins the datashape of each
+    new chunk into it, so memory use is bounded by the chunk size rather
+    than by the length of the stream.
+
+    >>> d = Discoverer()
+    >>> d.update([(1, 'Alice'), (2, 'Bob')])
+    >>> d.update([(3.5, ''), (4, 'Charlie')])
+    >>> d.result()
+    dshape("var * (float64, ?string)")
+    >>> d.count
+    4
+
+    Chunks of scalars are treated as a single column
+
+    >>> d = Discoverer()
+    >>> d.update(['1', '2'])
+    >>> d.update(['3', None])
+    >>> d.result()
+    dshape("var * ?int64")
+    """
+    def __init__(self):
+        self.columns = None
+        self.rows = None
+        self.count = 0
+
+    @property
+    def done(self):
+        """ Whether every column has been widened to ``string``
+
+        Nothing but missing values can change the result once this is true,
+        so a caller can stop reading the stream early.
+        """
+        return (self.columns is not None and
+                all(_strip_option(c) == string for c in self.columns))
+
+    def update(self, chunk):
+        """ Fold a chunk of rows or scalars into the running datashape """
+        chunk = list(chunk)
+        if not chunk:
+            return
+        rows = all(isinstance(item, (tuple, list)) for item in chunk)
+        if self.rows is None:
+            self.rows = rows
+        elif rows != self.rows:
+            raise ValueError('Cannot mix rows and scalars in one stream')
+        if rows:
+            widths = set(map(len, chunk))
+            if len(widths) != 1 or (self.columns is not None and
+                                    widths != set([len(self.columns)])):
+                raise ValueError('Rows of a stream must all have the same '
+                                 'number of columns, got widths %s'
+                                 % sorted(widths))
+            columns = list(zip(*chunk))
+        else:
+            columns = [chunk]
+        if self.columns is None:
+            self.columns = [None] * len(columns)
+        for i, column in enumerate(columns):
+            current = self.columns[i]
+            if current == string:
+                # Only missing values can still widen a string column
+                if any(v is None or v == '' for v in column):
+                    self.columns[i] = Option(string)
+                continue
+            elif current == Option(string):
+                continue
+            ds = discover_column(column)
+            if ds is None:
+                raise ValueError('Column %d of the chunk has no common '
+                                 'datashape' % i)
+            self.columns[i] = _join(current, unpack(ds.subshape[0]))
+        self.count += len(chunk)
+
+    def result(self):
+        """ The datashape of all rows seen so far, None before any rows """
+        if self.columns is None:
+            return None
+        if self.rows:
+            # Columns unite the way discover unites them
+            unite = do_one([unite_identical, unite_merge_dimensions, Tuple])
+            return var * unite(self.columns)
+        return var * self.columns[0]
+
+
+def _strip_option(ds):
+    return ds.ty if isinstance(ds, Option) else ds
+
+
+def _join(a, b):
+    """ The lowest datashape both ``a`` and ``b`` can turn into
+
+    >>> _join(int32, Option(float64))
+    ?float64
+    >>> _join(null, string)
+    ?string
+    """
+    if a is None or a == b:
+        return b
+    nullable = (isinstance(a, Option) or isinstance(b, Option) or
+                isnull(a) or isnull(b))
+    a, b = _strip_option(unpack(a)), _strip_option(unpack(b))
+    if isnull(a) or isnull(b):
+        base = b if isnull(a) else a
+    elif a == b:
+        base = a
+    elif (isinstance(a, DataShape) and isinstance(b, DataShape) and
+          len(a) == len(b) > 1 and isdimension(a[0]) and isdimension(b[0])):
+        dim = a[0] if a[0] == b[0] else var
+        base = dim * _join(a.subshape[0], b.subshape[0])
+    else:
+        base = lowest_common_dshape([a, b])
+        if base is None:
+            raise ValueError('No common datashape for %s and %s' % (a, b))
+    if isnull(base):
+        return null
+    return Option(base) if nullable else base
+
+
 def isnull(ds):
     return ds == null or ds == DataShape(null)
 
@@ -134,6 +507,24 @@ def lowest_common_dshape(dshapes):
     >>> lowest_common_dshape([string, int64])
     ctype("string")
     """
+    if not isinstance(dshapes, (list, tuple, set, frozenset)):
+        dshapes = list(dshapes)
+    try:
+        codes = set([type_ids[ds] for ds in dshapes])
+    except KeyError:  # not in the lattice
+        return _lowest_common_dshape(dshapes)
+    if not codes:
+        return _lowest_common_dshape(dshapes)
+    codes = iter(codes)
+    code = next(codes)
+    for other in codes:
+        code = join_table[code][other]
+        if code < 0:
+            return None
+    return toposorted[code]
+
+
+def _lowest_common_dshape(dshapes):
     common = set.intersection(*[descendents(edges, ds) for ds in dshapes])
     if common:
         return min(common, key=toposorted.index)
@@ -242,3 +633,17 @@ def descendents(d, x):
         children -= desc
         desc.update(children)
     return desc
+
+
+# The lattice compiled into a table: join_table[i][j] is the index in
+# toposorted of the lowest common dshape of toposorted[i] and
+# toposorted[j], or -1 if they have none
+type_ids = dict((ds, i) for i, ds in enumerate(toposorted))
+join_table = tuple(tuple(type_ids.get(_lowest_common_dshape([a, b]), -1)
+                         for b in toposorted)
+                   for a in toposorted)
+
+
+# Strings and datetimes are left out, their datashapes depend on the value
+discover.add_exact_types([0, 0.0, False, 0j, None] +
+                         [np.dtype(c).type(0) for c in '?bhilqBHILQefdgFDG'])
@@ -6,6 +6,9 @@ Do not import datashape modules into this module.  See util.py in that case
 
 from __future__ import print_function, division, absolute_import
 
+import threading
+from collections import namedtuple
+
 
 class IndexCallable(object):
     """ Provide getitem syntax for functions
@@ -134,3 +137,111 @@ def raises(exception, lamda):
         return False
     except exception:
         return True
+
+
+CacheInfo = namedtuple('CacheInfo', 'hits, misses, maxsize, currsize')
+
+
+class LRUCache(object):
+    """ A thread-safe mapping which holds at most ``maxsize`` entries,
+    evicting the least recently used one when full
+
+    >>> cache = LRUCache(2)
+    >>> cache.put('a', 1)
+    >>> cache.put('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.put('c', 3)
+    >>> cache.get('b') is None
+    True
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+    """
+    # Each entry is a [prev, next, key, value] link in a circular
+    # doubly linked list, most recently used just before the root
+    PREV, NEXT, KEY, VALUE = 0, 1, 2, 3
+
+    def __init__(self, maxsize=128):
+        if maxsize < 1:
+            raise ValueError('LRUCache maxsize must be positive, not %r'
+                             % maxsize)
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._map = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        """ Return the value for ``key``, marking it most recently used """
+        with self._lock:
+            link = self._map.get(key)
+            if link is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._move_to_end(link)
+            return link[self.VALUE]
+
+    def put(self, key, value):
+        """ Store ``value`` under ``key``, evicting if the cache is full """
+        with self._lock:
+            link = self._map.get(key)
+            if link is not None:
+                link[self.VALUE] = value
+                self._move_to_end(link)
+                return
+            root = self._root
+            last = root[self.PREV]
+            link = [last, root, key, value]
+            last[self.NEXT] = root[self.PREV] = self._map[key] = link
+            self._evict()
+
+    def _move_to_end(self, link):
+        prev, next = link[self.PREV], link[self.NEXT]
+        prev[self.NEXT], next[self.PREV] = next, prev
+        root = self._root
+        last = root[self.PREV]
+        link[self.PREV], link[self.NEXT] = last, root
+        last[self.NEXT] = root[self.PREV] = link
+
+    def _evict(self):
+        root = self._root
+        while len(self._map) > self._maxsize:
+            oldest = root[self.NEXT]
+            root[self.NEXT] = oldest[self.NEXT]
+            oldest[self.NEXT][self.PREV] = root
+            del self._map[oldest[self.KEY]]
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        if maxsize < 1:
+            raise ValueError('LRUCache maxsize must be positive, not %r'
+                             % maxsize)
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """ Remove all entries and reset the hit/miss counters """
+        with self._lock:
+            self._map.clear()
+            root = self._root
+            root[:] = [root, root, None, None]
+            self.hits = self.misses = 0
+
+    def info(self):
+        """ Return a ``CacheInfo(hits, misses, maxsize, currsize)`` tuple """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize,
+                             len(self._map))
+
+    def __contains__(self, key):
+        return key in self._map
+
+    def __len__(self):
+        return len(self._map)
@@ -12,7 +12,7 @@ from . import error
 
 # This is updated to include all the token names from _tokens,
 # where e.g. _tokens[NAME_LOWER-1] is the entry for NAME_LOWER
-__all__ = ['lex', 'Token']
+__all__ = ['lex', 'tokenize', 'Token']
 
 def _str_val(s):
     # Use the Python parser via the ast module to parse the string,
@@ -55,8 +55,58 @@ _tokens_re = re.compile('|'.join('(' + tok[1] + ')' for tok in _tokens),
                         re.MULTILINE)
 _whitespace_re = re.compile(_whitespace, re.MULTILINE)
 
+# A single regex which skips whitespace and matches one token, a
+# catch-all group for the first character of an invalid token, or the
+# end of the string.  The whitespace is matched in a lookahead and then
+# consumed with a backreference, so that the catch-all can't backtrack
+# into it.
+_INVALID = len(_tokens) + 2
+_scan_re = re.compile('(?=(' + _whitespace + r'))\1(?:' +
+                      '|'.join('(' + tok[1] + ')' for tok in _tokens) +
+                      r'|(.)|\Z)', re.MULTILINE)
+
+# The value extraction function for each token id, or None
+_token_values = [None] + [tok[2] if len(tok) > 2 else None for tok in _tokens]
+_token_names = [None] + [tok[0] for tok in _tokens]
+
 Token = collections.namedtuple('Token', 'id, name, span, val')
 
+
+def tokenize(ds_str):
+    """Lexes a datashape string in one pass into parallel lists.
+
+    Returns a tuple ``(ids, spans, vals, error_pos)``, where the lists
+    hold the id, ``(start, stop)`` span and value of each token.  If
+    an invalid token is found, lexing stops there and ``error_pos`` is
+    its position, otherwise it is None.  The error is left for the
+    caller to raise when it gets to that token.
+
+    >>> tokenize('3 * int32')
+    ([17, 4, 1], [(0, 1), (2, 3), (4, 9)], [3, None, 'int32'], None)
+    >>> tokenize('3 * $')[3]
+    4
+    """
+    ids, spans, vals = [], [], []
+    error_pos = None
+    for m in _scan_re.finditer(ds_str):
+        group = m.lastindex
+        if group is None or group == 1:
+            # Only whitespace was left
+            break
+        elif group == _INVALID:
+            error_pos = m.start(group)
+            break
+        span = m.span(group)
+        # Group 1 is the whitespace
+        id = group - 1
+        ids.append(id)
+        spans.append(span)
+        convert = _token_values[id]
+        vals.append(None if convert is None else
+                    convert(ds_str[span[0]:span[1]]))
+    return ids, spans, vals, error_pos
+
+
 def lex(ds_str):
     """A generator which lexes a datashape string into a
     sequence of tokens.
@@ -70,33 +120,10 @@ def lex(ds_str):
         for tok in datashape.lexer.lex(s):
             print(tok.id, tok.name, tok.span, repr(tok.val))
     """
-    pos = 0
-    # Skip whitespace
-    m = _whitespace_re.match(ds_str, pos)
-    if m:
-        pos = m.end()
-    while pos < len(ds_str):
-        # Try to match a token
-        m = _tokens_re.match(ds_str, pos)
-        if m:
-            # m.lastindex gives us which group was matched, which
-            # is one greater than the index into the _tokens list.
-            id = m.lastindex
-            tokinfo = _tokens[id - 1]
-            name = tokinfo[0]
-            span = m.span()
-            if len(tokinfo) > 2:
-                val = tokinfo[2](ds_str[span[0]:span[1]])
-            else:
-                val = None
-            pos = m.end()
-            yield Token(id, name, span, val)
-        else:
-            raise error.DataShapeSyntaxError(pos, '<nofile>',
-                                             ds_str,
-                                             'Invalid DataShape token')
-        # Skip whitespace
-        m = _whitespace_re.match(ds_str, pos)
-        if m:
-            pos = m.end()
-
+    ids, spans, vals, error_pos = tokenize(ds_str)
+    for id, span, val in zip(ids, spans, vals):
+        yield Token(id, _token_names[id], span, val)
+    if error_pos is not None:
+        raise error.DataShapeSyntaxError(error_pos, '<nofile>',
+                                         ds_str,
+                                         'Invalid DataShape token')
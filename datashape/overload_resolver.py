@@ -4,6 +4,8 @@ from . import coretypes, util
 from .error import UnificationError, CoercionError, OverloadError
 from .type_equation_solver import (match_argtypes_to_signature,
                                    PrunedMatchProcessing)
+from .coercion import dtype_coercion_cost
+from .internal_utils import LRUCache
 
 __all__ = ['OverloadResolver']
 
@@ -13,20 +15,29 @@ inf = float('inf')
 class OverloadResolver(object):
     """
     An object which encapsulates multiple dispatch for a set of
-    overloads, all of which are function signatures. This object
-    is designed so that an acceleration structure could be added
-    to it for speeding up overload resolution, without breaking
-    the interface.
+    overloads, all of which are function signatures.
+
+    Resolution first narrows the overloads down to the candidates
+    whose arity, number of dimensions and measures could possibly
+    match the argument types, using an index built when overloads
+    are added, and only runs the type equation solver on those.
+    The outcome of each resolution, match or error, is kept in a
+    bounded cache keyed on the argument types and the resolver.
 
     Parameters
     ----------
     name : str
         This is the name of the function the overloader is for,
         for error messages to provide some more context.
+    cache_size : int, optional
+        The number of resolutions to remember.
     """
-    def __init__(self, name):
+    def __init__(self, name, cache_size=1024):
         self.__overloads = []
         self.name = name
+        self._cache = LRUCache(maxsize=cache_size)
+        self._candidates = LRUCache(maxsize=cache_size)
+        self._rebuild_overload_resolution_accel()
 
     def extend_overloads(self, overloads):
         """
@@ -55,8 +66,74 @@ class OverloadResolver(object):
         return self.__overloads[item]
 
     def _rebuild_overload_resolution_accel(self):
-        # TODO Create an accelerator data structure here
-        pass
+        """
+        Groups the overloads by arity, and for each argument position
+        indexes them by the number of dimensions and the measure they
+        accept. Candidate lists are memoized per distinct query, in a
+        cache bounded like the one of resolutions.
+        """
+        self._by_arity = {}
+        for i, sig in enumerate(self.__overloads):
+            nargs = len(sig.argtypes)
+            if nargs not in self._by_arity:
+                self._by_arity[nargs] = _ArityIndex(nargs)
+            self._by_arity[nargs].add(i, sig)
+        self._candidates.clear()
+        self._cache.clear()
+
+    def cache_info(self):
+        """
+        Returns the (hits, misses, maxsize, currsize) of the cache
+        of resolved overloads.
+        """
+        return self._cache.info()
+
+    def _find_candidates(self, argstype):
+        """
+        Returns the indices, in order, of the overloads which could
+        match the argument types. Every overload left out would fail
+        to match with a CoercionError.
+        """
+        nargs = len(argstype.dshapes)
+        index = self._by_arity.get(nargs)
+        if index is None:
+            return ()
+        key = tuple(_query_key(ds) for ds in argstype.dshapes)
+        if None in key:
+            # Not concrete enough to prune safely
+            return index.all
+        result = self._candidates.get(key)
+        if result is None:
+            result = index.candidates(key)
+            self._candidates.put(key, result)
+        return result
+
+    def _match_overloads(self, argstype, indices, resolver):
+        result = []
+        min_cost = inf
+        err = None
+        for i in indices:
+            sig = self.__overloads[i]
+            try:
+                matched_sig, cost = match_argtypes_to_signature(argstype,
+                                                                sig,
+                                                                resolver,
+                                                                min_cost)
+            except PrunedMatchProcessing:
+                pass
+            except UnificationError as e:
+                err = e
+                pass
+            except CoercionError as e:
+                err = e
+                pass
+            else:
+                if cost <= min_cost:
+                    if cost < min_cost:
+                        result = []
+                    min_cost = cost
+                    result.append((i, matched_sig))
+        return result, err
 
     def resolve_overload(self, argstype, resolver=None):
         """
@@ -76,33 +153,36 @@ class OverloadResolver(object):
             where sym is the unresolved symbol and tvdict is a
             dictionary of all the matched symbols.
         """
-        # TODO Use accelerator data structure instead of naive loop
-        nargs = len(argstype.dshapes)
-        result = []
-        min_cost = inf
-        err = None
-        for i, sig in enumerate(self.__overloads):
-            # If it's the right number of args, try matching it
-            if nargs == len(sig.argtypes):
-                try:
-                    matched_sig, cost = match_argtypes_to_signature(argstype,
-                                                                    sig,
-                                                                    resolver,
-                                                                    min_cost)
-                except PrunedMatchProcessing:
-                    pass
-                except UnificationError as e:
-                    err = e
-                    pass
-                except CoercionError as e:
-                    err = e
-                    pass
-                else:
-                    if cost <= min_cost:
-                        if cost < min_cost:
-                            result = []
-                        min_cost = cost
-                        result.append((i, matched_sig))
+        key = (argstype, resolver)
+        try:
+            cached = self._cache.get(key)
+        except TypeError:  # unhashable resolver
+            return self._resolve_overload(argstype, resolver)
+        if cached is None:
+            try:
+                cached = False, self._resolve_overload(argstype, resolver)
+            except (OverloadError, UnificationError, CoercionError) as e:
+                cached = True, e
+            self._cache.put(key, cached)
+        failed, value = cached
+        if failed:
+            # Don't let the tracebacks of every raise pile up
+            value.__traceback__ = None
+            raise value
+        return value
+
+    def _resolve_overload(self, argstype, resolver):
+        result, err = self._match_overloads(argstype,
+                                            self._find_candidates(argstype),
+                                            resolver)
+        if len(result) == 0:
+            # Match against every overload of the right arity, so
+            # that the error raised is the same as without pruning
+            nargs = len(argstype.dshapes)
+            index = self._by_arity.get(nargs)
+            result, err = self._match_overloads(argstype,
+                                                index.all if index else (),
+                                                resolver)
         if len(result) == 0:
             # If a coercion error was caught while matching,
             # reraise it.
@@ -119,3 +199,81 @@ class OverloadResolver(object):
                                 (self.name, argstype,
                                  "\n".join("    %s" % x[1] for x in result)))
         return result[0]
+
+
+def _query_key(ds):
+    """
+    The (ndim, measure) of a concrete argument type, or None if
+    the argument has symbolic dimensions or an unusual measure.
+    """
+    if not isinstance(ds, coretypes.DataShape):
+        return None
+    dims = ds.parameters[:-1]
+    measure = ds.parameters[-1]
+    if (all(isinstance(dim, (coretypes.Fixed, coretypes.Var))
+            for dim in dims) and
+            getattr(measure, 'cls', None) == coretypes.MEASURE):
+        return len(dims), measure
+    return None
+
+
+class _ArityIndex(object):
+    """
+    Index of the overloads with a given number of arguments, by the
+    number of dimensions and the measure of each argument.
+    """
+    def __init__(self, nargs):
+        self.all = []
+        self.always = set()
+        # Per argument: {ndim: indices} for exact dimension counts,
+        # [(min_ndim, index)] for signatures with an ellipsis
+        self.ndims = [{} for _ in range(nargs)]
+        self.ellipses = [[] for _ in range(nargs)]
+        # Per argument: {measure: indices} for concrete measures
+        self.measures = [{} for _ in range(nargs)]
+        # Per argument: indices accepting any ndim or any measure
+        self.any_ndim = [set() for _ in range(nargs)]
+        self.any_measure = [set() for _ in range(nargs)]
+
+    def add(self, i, sig):
+        self.all.append(i)
+        for k, ds in enumerate(sig.argtypes):
+            if not isinstance(ds, coretypes.DataShape):
+                # Matching raises a TypeError, keep it a candidate
+                self.always.add(i)
+                continue
+            dims = ds.parameters[:-1]
+            nellipses = sum(isinstance(dim, coretypes.Ellipsis)
+                            for dim in dims)
+            if nellipses == 0:
+                self.ndims[k].setdefault(len(dims), set()).add(i)
+            elif nellipses == 1:
+                self.ellipses[k].append((len(dims) - 1, i))
+            else:
+                self.any_ndim[k].add(i)
+            measure = ds.parameters[-1]
+            if isinstance(measure, coretypes.TypeVar):
+                self.any_measure[k].add(i)
+            else:
+                self.measures[k].setdefault(measure, set()).add(i)
+
+    def candidates(self, key):
+        """
+        The sorted indices of the overloads whose dimension counts and
+        measures can accept the (ndim, measure) of every argument.
+        """
+        result = None
+        for k, (ndim, measure) in enumerate(key):
+            found = set(self.any_ndim[k])
+            found.update(self.ndims[k].get(ndim, ()))
+            found.update(i for min_ndim, i in self.ellipses[k]
+                         if ndim >= min_ndim)
+            accepts = set(self.any_measure[k])
+            for dst, indices in self.measures[k].items():
+                if dtype_coercion_cost(measure, dst) != inf:
+                    accepts.update(indices)
+            found &= accepts
+            result = found if result is None else result & found
+            if not result:
+                break
+        return tuple(sorted(result | self.always))
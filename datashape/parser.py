@@ -18,42 +18,53 @@ class DataShapeParser(object):
         self.ds_str = ds_str
         # Symbol tables for dimensions, dtypes, and type constructors for each
         self.sym = sym
-        # The lexer
-        self.lex = lexer.lex(ds_str)
-        # The array of tokens self.lex has already produced
-        self.tokens = []
-        # The token currently being examined, and
-        # the end position, set when self.lex is exhausted
+        # The ids, spans and values of all the tokens, in parallel
+        # lists, and the position of an invalid token if there is one
+        (self.ids, self.spans, self.vals,
+         self.lex_error_pos) = lexer.tokenize(ds_str)
+        # Finish with an EOF token, whose span starts at the
+        # end of the last token to use for error messages
+        if self.spans:
+            span = (self.spans[-1][1],)*2
+        else:
+            span = (0, 0)
+        self.ids.append(None)
+        self.spans.append(span)
+        self.vals.append(None)
+        # The token currently being examined, and the end position
         self.pos = -1
-        self.end_pos = None
+        self.end_pos = len(self.ids) - 1
         # Advance to the first token
         self.advance_tok()
 
     def advance_tok(self):
         """Advances self.pos by one, if it is not already at the end."""
         if self.pos != self.end_pos:
-            self.pos = self.pos + 1
-            try:
-                # If self.pos has not been backtracked,
-                # we need to request a new token from the lexer
-                if self.pos >= len(self.tokens):
-                    self.tokens.append(next(self.lex))
-            except StopIteration:
-                # Create an EOF token, whose span starts at the
-                # end of the last token to use for error messages
-                if len(self.tokens) > 0:
-                    span = (self.tokens[self.pos-1].span[1],)*2
-                else:
-                    span = (0, 0)
-                self.tokens.append(lexer.Token(None, None, span, None))
-                self.end_pos = self.pos
+            pos = self.pos + 1
+            if pos == self.end_pos and self.lex_error_pos is not None:
+                # Lexing stopped at an invalid token, which is
+                # reported once the parser gets to it
+                raise error.DataShapeSyntaxError(self.lex_error_pos,
+                                                 '<nofile>', self.ds_str,
+                                                 'Invalid DataShape token')
+            self.pos = pos
 
     @property
     def tok(self):
-        return self.tokens[self.pos]
+        id = self.ids[self.pos]
+        return lexer.Token(id, lexer._token_names[id] if id else None,
+                           self.spans[self.pos], self.vals[self.pos])
+
+    @property
+    def tok_id(self):
+        return self.ids[self.pos]
+
+    @property
+    def tok_val(self):
+        return self.vals[self.pos]
 
     def raise_error(self, errmsg):
-        raise error.DataShapeSyntaxError(self.tok.span[0], '<nofile>',
+        raise error.DataShapeSyntaxError(self.spans[self.pos][0], '<nofile>',
                                          self.ds_str, errmsg)
 
     def parse_homogeneous_list(self, parse_item, sep_tok_id, errmsg,
@@ -73,7 +84,7 @@ class DataShapeParser(object):
             item = parse_item()
             if item is not None:
                 items.append(item)
-                if self.tok.id == sep_tok_id:
+                if self.tok_id == sep_tok_id:
                     # If a <SEP> is next, there are more items
                     self.advance_tok()
                 else:
@@ -127,7 +138,7 @@ class DataShapeParser(object):
 
         Returns a datashape object or None.
         """
-        if self.tok.id == lexer.QUESTIONMARK:
+        if self.tok_id == lexer.QUESTIONMARK:
             self.advance_tok()
             saved_pos = self.pos
             ds = self.parse_datashape_nooption()
@@ -151,7 +162,7 @@ class DataShapeParser(object):
         # Try dim ASTERISK datashape
         dim = self.parse_dim()
         if dim is not None:
-            if self.tok.id == lexer.ASTERISK:
+            if self.tok_id == lexer.ASTERISK:
                 # If an asterisk is next, we're good
                 self.advance_tok()
                 saved_pos = self.pos
@@ -184,18 +195,18 @@ class DataShapeParser(object):
         TODO: Support type constructors
         """
         saved_pos = self.pos
-        tok = self.tok
-        if tok.id == lexer.NAME_UPPER:
-            val = tok.val
+        tok_id = self.tok_id
+        if tok_id == lexer.NAME_UPPER:
+            val = self.tok_val
             self.advance_tok()
-            if self.tok.id == lexer.ELLIPSIS:
+            if self.tok_id == lexer.ELLIPSIS:
                 self.advance_tok()
                 # TypeVars ellipses are treated as the "ellipsis" dim
                 tconstr = self.syntactic_sugar(self.sym.dim_constr, 'ellipsis',
                                                'TypeVar... dim constructor',
                                                saved_pos)
                 return tconstr(val)
-            elif self.tok.id == lexer.ASTERISK:
+            elif self.tok_id == lexer.ASTERISK:
                 # Using a lookahead check for '*' after the TypeVar, so that
                 # the error message would be about a dtype problem instead
                 # of a dim problem when 'typevar' isn't in the symbol table
@@ -208,17 +219,17 @@ class DataShapeParser(object):
             else:
                 self.pos = saved_pos
                 return None
-        elif tok.id == lexer.NAME_LOWER:
-            name = tok.val
+        elif tok_id == lexer.NAME_LOWER:
+            name = self.tok_val
             self.advance_tok()
-            if self.tok.id == lexer.LBRACKET:
+            if self.tok_id == lexer.LBRACKET:
                 dim_constr = self.sym.dim_constr.get(name)
                 if dim_constr is None:
                     self.pos = saved_pos
                     return None
                 self.advance_tok()
                 args = self.parse_type_arg_list()
-                if self.tok.id == lexer.RBRACKET:
+                if self.tok_id == lexer.RBRACKET:
                     self.advance_tok()
                     raise RuntimeError('dim type constructors not actually supported yet')
                 else:
@@ -230,19 +241,19 @@ class DataShapeParser(object):
                 else:
                     self.pos = saved_pos
                     return None
-        elif tok.id == lexer.INTEGER:
-            val = tok.val
+        elif tok_id == lexer.INTEGER:
+            val = self.tok_val
             self.advance_tok()
             # If the token after the INTEGER is not ASTERISK,
             # it cannot be a dim, so skip it
-            if self.tok.id != lexer.ASTERISK:
+            if self.tok_id != lexer.ASTERISK:
                 self.pos = saved_pos
                 return None
             # Integers are treated as "fixed" dimensions
             tconstr = self.syntactic_sugar(self.sym.dim_constr, 'fixed',
                                            'integer dimensions')
             return tconstr(val)
-        elif tok.id == lexer.ELLIPSIS:
+        elif tok_id == lexer.ELLIPSIS:
             self.advance_tok()
             # Ellipses are treated as the "ellipsis" dim
             dim = self.syntactic_sugar(self.sym.dim, 'ellipsis',
@@ -269,26 +280,26 @@ class DataShapeParser(object):
         Returns a the dtype object, or None.
         """
         saved_pos = self.pos
-        tok = self.tok
-        if tok.id == lexer.NAME_UPPER:
-            val = tok.val
+        tok_id = self.tok_id
+        if tok_id == lexer.NAME_UPPER:
+            val = self.tok_val
             self.advance_tok()
             # TypeVars are treated as the "typevar" dtype
             tconstr = self.syntactic_sugar(self.sym.dtype_constr, 'typevar',
                                            'TypeVar dtype constructor',
                                            saved_pos)
             return tconstr(val)
-        elif tok.id == lexer.NAME_LOWER:
-            name = tok.val
+        elif tok_id == lexer.NAME_LOWER:
+            name = self.tok_val
             self.advance_tok()
-            if self.tok.id == lexer.LBRACKET:
+            if self.tok_id == lexer.LBRACKET:
                 dtype_constr = self.sym.dtype_constr.get(name)
                 if dtype_constr is None:
                     self.pos = saved_pos
                     return None
                 self.advance_tok()
                 args, kwargs = self.parse_type_arg_list()
-                if self.tok.id == lexer.RBRACKET:
+                if self.tok_id == lexer.RBRACKET:
                     if len(args) == 0 and len(kwargs) == 0:
                         self.raise_error('Expected at least one type ' +
                                          'constructor argument')
@@ -303,9 +314,9 @@ class DataShapeParser(object):
                 else:
                     self.pos = saved_pos
                     return None
-        elif tok.id == lexer.LBRACE:
+        elif tok_id == lexer.LBRACE:
             return self.parse_struct_type()
-        elif tok.id == lexer.LPAREN:
+        elif tok_id == lexer.LPAREN:
             return self.parse_funcproto_or_tuple_type()
         else:
             return None
@@ -327,7 +338,7 @@ class DataShapeParser(object):
             # Parse the type_arg
             arg = self.parse_type_arg()
             if arg is not None:
-                if self.tok.id == lexer.COMMA:
+                if self.tok_id == lexer.COMMA:
                     # If a comma is next, there are more args
                     self.advance_tok()
                     args.append(arg)
@@ -360,18 +371,18 @@ class DataShapeParser(object):
         ds = self.parse_datashape()
         if ds is not None:
             return ds
-        if self.tok.id in [lexer.INTEGER, lexer.STRING]:
-            val = self.tok.val
+        if self.tok_id in [lexer.INTEGER, lexer.STRING]:
+            val = self.tok_val
             self.advance_tok()
             return val
-        elif self.tok.id == lexer.LBRACKET:
+        elif self.tok_id == lexer.LBRACKET:
             self.advance_tok()
             val = self.parse_datashape_list()
             if val is None:
                 val = self.parse_integer_list()
             if val is None:
                 val = self.parse_string_list()
-            if self.tok.id == lexer.RBRACKET:
+            if self.tok_id == lexer.RBRACKET:
                 self.advance_tok()
                 return [] if val is None else val
             else:
@@ -389,12 +400,12 @@ class DataShapeParser(object):
 
         Returns a (name, type_arg) tuple, or None.
         """
-        if self.tok.id != lexer.NAME_LOWER:
+        if self.tok_id != lexer.NAME_LOWER:
             return None
         saved_pos = self.pos
-        name = self.tok.val
+        name = self.tok_val
         self.advance_tok()
-        if self.tok.id != lexer.EQUAL:
+        if self.tok_id != lexer.EQUAL:
             self.pos = saved_pos
             return None
         self.advance_tok()
@@ -421,8 +432,8 @@ class DataShapeParser(object):
         """
         integer : INTEGER
         """
-        if self.tok.id == lexer.INTEGER:
-            val = self.tok.val
+        if self.tok_id == lexer.INTEGER:
+            val = self.tok_val
             self.advance_tok()
             return val
         else:
@@ -444,8 +455,8 @@ class DataShapeParser(object):
         """
         string : STRING
         """
-        if self.tok.id == lexer.STRING:
-            val = self.tok.val
+        if self.tok_id == lexer.STRING:
+            val = self.tok_val
             self.advance_tok()
             return val
         else:
@@ -470,17 +481,17 @@ class DataShapeParser(object):
 
         Returns a struct type, or None.
         """
-        if self.tok.id != lexer.LBRACE:
+        if self.tok_id != lexer.LBRACE:
             return None
         saved_pos = self.pos
         self.advance_tok()
         fields = self.parse_homogeneous_list(self.parse_struct_field, lexer.COMMA,
                                              'Invalid field in struct',
                                              trailing_sep=True)
-        if fields is None and self.tok.id == lexer.RBRACE:
+        if fields is None and self.tok_id == lexer.RBRACE:
             self.raise_error('At least one field is required in ' +
                              'struct datashape')
-        if self.tok.id != lexer.RBRACE:
+        if self.tok_id != lexer.RBRACE:
             self.raise_error('Invalid field in struct')
         self.advance_tok()
         # Split apart the names and types into separate lists,
@@ -502,12 +513,12 @@ class DataShapeParser(object):
 
         Returns a tuple (name, datashape object) or None
         """
-        if self.tok.id not in [lexer.NAME_LOWER, lexer.NAME_UPPER,
+        if self.tok_id not in [lexer.NAME_LOWER, lexer.NAME_UPPER,
                                lexer.NAME_OTHER, lexer.STRING]:
             return None
-        name = self.tok.val
+        name = self.tok_val
         self.advance_tok()
-        if self.tok.id != lexer.COLON:
+        if self.tok_id != lexer.COLON:
             self.raise_error('Expected a ":" separating the field ' +
                              'name from its datashape')
         self.advance_tok()
@@ -528,20 +539,20 @@ class DataShapeParser(object):
 
         Returns a tuple type object, a function prototype, or None.
         """
-        if self.tok.id != lexer.LPAREN:
+        if self.tok_id != lexer.LPAREN:
             return None
         saved_pos = self.pos
         self.advance_tok()
         dshapes = self.parse_homogeneous_list(self.parse_datashape, lexer.COMMA,
                                              'Invalid datashape in tuple',
                                              trailing_sep=True)
-        if dshapes is None and self.tok.id == lexer.RPAREN:
+        if dshapes is None and self.tok_id == lexer.RPAREN:
             self.raise_error('At least one datashape is required in ' +
                              'a tuple datashape')
-        if self.tok.id != lexer.RPAREN:
+        if self.tok_id != lexer.RPAREN:
             self.raise_error('Invalid datashape in tuple')
         self.advance_tok()
-        if self.tok.id != lexer.RARROW:
+        if self.tok_id != lexer.RARROW:
             # Tuples are treated as the "tuple" dtype
             tconstr = self.syntactic_sugar(self.sym.dtype_constr, 'tuple',
                                            '(...) dtype constructor', saved_pos)
@@ -33,15 +33,24 @@ if PY2:
     unicode = __builtin__.unicode
     basestring = __builtin__.basestring
     _strtypes = (str, unicode)
+    from itertools import imap
 else:
     from functools import reduce
     _inttypes = (int,)
     unicode = str
     basestring = str
     _strtypes = (str,)
+    imap = map
 
 if sys.version_info[:2] >= (2, 7):
-    from unittest import skip, skipIf
+    # unittest is slow to import and only needed by the tests
+    def skip(reason):
+        from unittest import skip
+        return skip(reason)
+
+    def skipIf(condition, reason):
+        from unittest import skipIf
+        return skipIf(condition, reason)
 else:
     from nose.plugins.skip import SkipTest
     class skip(object):
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+A compact binary encoding of datashape types.
+
+An encoded type is a version byte, a table of the strings it uses
+(field names, ctype names, type variables, encodings, ...), and then
+the type tree in prefix order.  Each node is a one byte tag followed by
+its parameters, with sizes and counts stored as unsigned LEB128 varints
+and strings as varint indexes into the string table, so a field name
+repeated across nested records is only stored once.
+
+Decoding walks the bytes once and builds the types directly, which is
+much cheaper than lexing and parsing the ``str()`` of a type.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from . import coretypes
+from .coretypes import (Mono, DataShape, CType, Fixed, Var, TypeVar,
+                        Ellipsis, Record, Tuple, Option, String, Bytes,
+                        Date, Time, DateTime, Units, JSON, Null, Function,
+                        IntegerConstant, StringConstant, Type, var)
+from .internal_utils import LRUCache
+from .py2help import unicode
+
+
+__all__ = ['dumps', 'loads', 'VERSION']
+
+
+# Decoded types keyed on their encoding, as schemas tend to be sent over
+# and over.  Like ``util.dshape_cache``, the types are handed out as is.
+loads_cache = LRUCache(maxsize=256)
+
+
+VERSION = 1
+
+# Node tags.  These are part of the format, only ever append to them.
+(_DATASHAPE, _CTYPE, _FIXED, _VAR, _TYPEVAR, _ELLIPSIS, _RECORD, _TUPLE,
+ _OPTION, _STRING, _BYTES, _DATE, _TIME, _DATETIME, _UNITS, _JSON, _NULL,
+ _FUNCTION, _INTEGERCONSTANT, _STRINGCONSTANT, _NAMED_CTYPE,
+ _SIZED_CTYPE) = range(22)
+
+# The ctypes written as an index into this list rather than by name.
+# Also part of the format, only ever append to it.
+_builtin_ctype_names = ['bool', 'char', 'int8', 'int16', 'int32', 'int64',
+                        'uint8', 'uint16', 'uint32', 'uint64', 'float16',
+                        'float32', 'float64', 'complex[float32]',
+                        'complex[float64]', 'void', 'object']
+_builtin_ctypes = [Type._registry[name] for name in _builtin_ctype_names]
+_builtin_ctype_ids = dict((name, i)
+                          for i, name in enumerate(_builtin_ctype_names))
+
+
+def _write_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+class _Encoder(object):
+    def __init__(self):
+        self.out = bytearray()
+        self.strings = []
+        self.string_ids = {}
+
+    def string(self, s):
+        """ Writes the string table index of ``s`` """
+        i = self.string_ids.get(s)
+        if i is None:
+            i = self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        _write_varint(self.out, i)
+
+    def optional_string(self, s):
+        """ Writes 0 for None, otherwise the string table index plus 1 """
+        if s is None:
+            self.out.append(0)
+        else:
+            i = self.string_ids.get(s)
+            if i is None:
+                i = self.string_ids[s] = len(self.strings)
+                self.strings.append(s)
+            _write_varint(self.out, i + 1)
+
+    def encode(self, ds):
+        out = self.out
+        tp = type(ds)
+        if tp is DataShape or tp is Function or tp is Tuple:
+            params = ds.dshapes if tp is Tuple else ds.parameters
+            out.append(_DATASHAPE if tp is DataShape else
+                       _FUNCTION if tp is Function else _TUPLE)
+            _write_varint(out, len(params))
+            for p in params:
+                self.encode(p)
+        elif tp is CType:
+            i = _builtin_ctype_ids.get(ds.name)
+            if i is None:
+                # Written with its size, so that a ctype which is not
+                # registered where the data is loaded can be recreated
+                out.append(_SIZED_CTYPE)
+                self.string(ds.name)
+                _write_varint(out, ds.itemsize)
+                _write_varint(out, ds.c_alignment)
+            else:
+                out.append(_CTYPE)
+                _write_varint(out, i)
+        elif tp is Fixed:
+            out.append(_FIXED)
+            _write_varint(out, ds.val)
+        elif tp is Var:
+            out.append(_VAR)
+        elif tp is Record:
+            out.append(_RECORD)
+            names, types = ds.names, ds.types
+            _write_varint(out, len(names))
+            for name, t in zip(names, types):
+                self.string(name)
+                self.encode(t)
+        elif tp is Option:
+            out.append(_OPTION)
+            self.encode(ds.ty)
+        elif tp is String:
+            out.append(_STRING)
+            _write_varint(out, 0 if ds.fixlen is None else ds.fixlen + 1)
+            self.string(ds.encoding)
+        elif tp is TypeVar:
+            out.append(_TYPEVAR)
+            self.string(ds.symbol)
+        elif tp is Ellipsis:
+            out.append(_ELLIPSIS)
+            if ds.typevar is None:
+                out.append(0)
+            else:
+                out.append(1)
+                self.encode(ds.typevar)
+        elif tp is Time or tp is DateTime:
+            out.append(_TIME if tp is Time else _DATETIME)
+            self.optional_string(ds.tz)
+        elif tp is Units:
+            out.append(_UNITS)
+            self.string(ds.unit)
+            self.encode(ds.tp)
+        elif tp is IntegerConstant:
+            out.append(_INTEGERCONSTANT)
+            # Zigzag, so small negative values stay small
+            val = ds.val
+            _write_varint(out, val * 2 if val >= 0 else -val * 2 - 1)
+        elif tp is StringConstant:
+            out.append(_STRINGCONSTANT)
+            self.string(ds.val)
+        elif tp in _unit_tags:
+            out.append(_unit_tags[tp])
+        else:
+            raise TypeError('Cannot serialize datashape type %s' %
+                            tp.__name__)
+
+    def getvalue(self):
+        header = bytearray([VERSION])
+        _write_varint(header, len(self.strings))
+        for s in self.strings:
+            b = unicode(s).encode('utf-8')
+            _write_varint(header, len(b))
+            header += b
+        return bytes(header + self.out)
+
+
+_unit_tags = {Bytes: _BYTES, Date: _DATE, JSON: _JSON, Null: _NULL}
+
+
+def dumps(ds):
+    """
+    Encodes a datashape type as bytes.
+
+    >>> from datashape import dshape
+    >>> data = dumps(dshape('var * {x: int32, y: ?float64}'))
+    >>> len(data)
+    22
+    >>> loads(data)
+    dshape("var * { x : int32, y : ?float64 }")
+    """
+    if not isinstance(ds, Mono):
+        raise TypeError('Cannot serialize object of type %s' %
+                        type(ds).__name__)
+    encoder = _Encoder()
+    encoder.encode(ds)
+    return encoder.getvalue()
+
+
+class _Decoder(object):
+    def __init__(self, data):
+        self.data = bytearray(data)
+        self.pos = 0
+
+    def varint(self):
+        data, pos = self.data, self.pos
+        b = data[pos]
+        pos += 1
+        if b < 0x80:
+            self.pos = pos
+            return b
+        n, shift = b & 0x7f, 7
+        while True:
+            b = data[pos]
+            pos += 1
+            n |= (b & 0x7f) << shift
+            if b < 0x80:
+                self.pos = pos
+                return n
+            shift += 7
+
+    def read_strings(self):
+        data = self.data
+        strings = []
+        for i in range(self.varint()):
+            n = self.varint()
+            end = self.pos + n
+            if end > len(data):
+                raise IndexError('string runs past the end of the data')
+            strings.append(data[self.pos:end].decode('utf-8'))
+            self.pos = end
+        self.strings = strings
+
+    def decode(self):
+        tag = self.data[self.pos]
+        self.pos += 1
+        return _decoders[tag](self)
+
+    def datashape(self):
+        return DataShape(*[self.decode() for i in range(self.varint())])
+
+    def ctype(self):
+        return _builtin_ctypes[self.varint()]
+
+    def named_ctype(self):
+        ct = Type._registry[self.strings[self.varint()]]
+        if not isinstance(ct, CType):
+            raise ValueError('%s is not a ctype' % ct)
+        return ct
+
+    def sized_ctype(self):
+        name = self.strings[self.varint()]
+        itemsize, alignment = self.varint(), self.varint()
+        ct = Type._registry.get(name)
+        if ct is None:
+            # Left out of the registry, so that decoding data can't add
+            # names to it
+            ct = object.__new__(CType)
+            ct.name, ct._itemsize, ct._alignment = name, itemsize, alignment
+            return ct
+        if not isinstance(ct, CType):
+            raise ValueError('%s is not a ctype' % ct)
+        return ct
+
+    def fixed(self):
+        return Fixed(self.varint())
+
+    def var(self):
+        return var
+
+    def typevar(self):
+        return TypeVar(self.strings[self.varint()])
+
+    def ellipsis(self):
+        has_typevar = self.data[self.pos]
+        self.pos += 1
+        return Ellipsis(self.decode() if has_typevar else None)
+
+    def record(self):
+        strings, decode, varint = self.strings, self.decode, self.varint
+        return Record([(strings[varint()], decode())
+                       for i in range(varint())])
+
+    def tuple(self):
+        return Tuple([self.decode() for i in range(self.varint())])
+
+    def option(self):
+        return Option(self.decode())
+
+    def string(self):
+        fixlen = self.varint()
+        encoding = self.strings[self.varint()]
+        if fixlen:
+            return String(fixlen - 1, encoding)
+        elif encoding == coretypes.string.encoding:
+            return coretypes.string
+        return String(encoding)
+
+    # The types without parameters decode to the module level instances
+
+    def bytes(self):
+        return coretypes.bytes_
+
+    def date(self):
+        return coretypes.date_
+
+    def time(self):
+        i = self.varint()
+        return Time(self.strings[i - 1]) if i else coretypes.time_
+
+    def datetime(self):
+        i = self.varint()
+        return DateTime(self.strings[i - 1]) if i else coretypes.datetime_
+
+    def units(self):
+        unit = self.strings[self.varint()]
+        return Units(unit, self.decode())
+
+    def json(self):
+        return coretypes.json
+
+    def null(self):
+        return coretypes.null
+
+    def function(self):
+        return Function(*[self.decode() for i in range(self.varint())])
+
+    def integer_constant(self):
+        n = self.varint()
+        return IntegerConstant(n // 2 if n % 2 == 0 else -(n + 1) // 2)
+
+    def string_constant(self):
+        return StringConstant(self.strings[self.varint()])
+
+
+# Indexed by tag
+_decoders = [_Decoder.datashape, _Decoder.ctype, _Decoder.fixed,
+             _Decoder.var, _Decoder.typevar, _Decoder.ellipsis,
+             _Decoder.record, _Decoder.tuple, _Decoder.option,
+             _Decoder.string, _Decoder.bytes, _Decoder.date, _Decoder.time,
+             _Decoder.datetime, _Decoder.units, _Decoder.json, _Decoder.null,
+             _Decoder.function, _Decoder.integer_constant,
+             _Decoder.string_constant, _Decoder.named_ctype,
+             _Decoder.sized_ctype]
+
+
+def loads(data):
+    """
+    Decodes a datashape type encoded by ``dumps``.
+
+    Raises ValueError if the data is not a valid encoding.
+
+    >>> from datashape import dshape
+    >>> loads(dumps(dshape('3 * (int32, string)')))
+    dshape("3 * (int32, string)")
+    """
+    data = bytes(data)
+    ds = loads_cache.get(data)
+    if ds is not None:
+        return ds
+    decoder = _Decoder(data)
+    if not decoder.data or decoder.data[0] != VERSION:
+        raise ValueError('Unsupported datashape serialization version')
+    decoder.pos = 1
+    try:
+        decoder.read_strings()
+        ds = decoder.decode()
+    except (IndexError, KeyError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid serialized datashape: %s' % e)
+    if decoder.pos != len(decoder.data):
+        raise ValueError('Invalid serialized datashape: '
+                         'trailing bytes after the type')
+    loads_cache.put(data, ds)
+    return ds
@@ -1,8 +1,10 @@
 from __future__ import absolute_import, division, print_function
 
 import unittest
+import warnings
 
-from datashape import coercion_cost, dshape, dshapes, error
+from datashape import coercion_cost, dshape, dshapes, error, coercion
+from datashape.coercion import CoercionTable, DefaultCoercionTable
 from datashape.tests import common
 from datashape.py2help import skip
 
@@ -109,5 +111,50 @@ class TestCoercionErrors(unittest.TestCase):
                               dshape('bool'), dshape(ds))
 
 
+class TestCoercionMatrix(unittest.TestCase):
+
+    def test_shortest_paths(self):
+        table = CoercionTable()
+        a, b, c, d = [ds.measure for ds in
+                      dshapes('int8', 'int16', 'int32', 'float64')]
+        table.add_coercion(c, d, 1)
+        table.add_coercion(a, b, 1)
+        table.add_coercion(b, c, 1)
+        table.add_coercion(a, d, 5)
+        self.assertEqual(table.coercion_cost(a, d), 3)
+        self.assertRaises(KeyError, table.coercion_cost, d, a)
+        table.add_coercion(d, a, 2, transitive=False)
+        self.assertEqual(table.coercion_cost(d, a), 2)
+        self.assertRaises(KeyError, table.coercion_cost, d, b)
+
+    def test_table_deprecated(self):
+        table = CoercionTable()
+        a, b = [ds.measure for ds in dshapes('int8', 'int16')]
+        table.add_coercion(a, b, 1)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(table.table, {(a, a): 0, (a, b): 1, (b, b): 0})
+        self.assertEqual(w[0].category, DeprecationWarning)
+
+    def test_batch_matches_pairs(self):
+        types = [ds.measure for ds in
+                 dshapes('bool', 'int8', 'uint32', 'float32', 'float64',
+                         'complex[float64]', 'string')]
+        costs = coercion.coercion_cost_matrix(types, types)
+        for i, src in enumerate(types):
+            for j, dst in enumerate(types):
+                self.assertEqual(costs[i, j],
+                                 coercion.dtype_coercion_cost(src, dst))
+        self.assertEqual(costs[2, 5], 3.7)
+
+    def test_default_rules_loaded_on_first_use(self):
+        table = DefaultCoercionTable()
+        self.assertEqual(table.rules, [])
+        int8, float64 = [ds.measure for ds in dshapes('int8', 'float64')]
+        self.assertEqual(table.coercion_cost(int8, float64),
+                         coercion.coercion_cost_table(int8, float64))
+        self.assertEqual(len(table.rules), len(coercion._table.rules))
+
+
 if __name__ == '__main__':
     unittest.main()
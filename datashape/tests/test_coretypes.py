@@ -1,6 +1,13 @@
-from datashape.coretypes import Record, real
+from datashape.coretypes import (Record, real, intern_type, set_interning,
+                                 DataShape, Fixed, Option, Tuple, Var,
+                                 CType, Type, int32, int64, var, string)
 from datashape import dshape, to_numpy_dtype
+import datashape
 import numpy as np
+import os
+import pickle
+import subprocess
+import sys
 import unittest
 
 class TestRecord(unittest.TestCase):
@@ -36,3 +43,143 @@ class TestOther(unittest.TestCase):
     def test_eq(self):
         self.assertEqual(dshape('int'), dshape('int'))
         self.assertNotEqual(dshape('int'), 'apple')
+
+
+class TestInterning(unittest.TestCase):
+    def test_structural_types_intern_to_one_object(self):
+        self.assertTrue(intern_type(Fixed(10)) is intern_type(Fixed(10)))
+        self.assertTrue(intern_type(Var()) is var)
+        self.assertTrue(intern_type(Option(int32)) is
+                        intern_type(Option(int32)))
+        self.assertTrue(intern_type(Tuple([int32, string])) is
+                        intern_type(Tuple([int32, string])))
+        a = dshape('10 * {x: int32, y: ?string}')
+        b = dshape('10 * {x: int32, y: ?string}')
+        self.assertTrue(intern_type(a) is intern_type(b))
+
+    def test_children_are_interned(self):
+        ds = intern_type(DataShape(Fixed(3), Var(), Record([('x', int32)])))
+        self.assertTrue(ds[1] is var)
+        self.assertTrue(ds[0] is intern_type(Fixed(3)))
+        self.assertTrue(ds[2].fields['x'] is intern_type(DataShape(int32)))
+
+    def test_equality_and_hash(self):
+        a = intern_type(dshape('3 * int32'))
+        b = intern_type(dshape('3 * int64'))
+        self.assertEqual(a, dshape('3 * int32'))
+        self.assertNotEqual(a, b)
+        self.assertEqual(hash(a), hash(dshape('3 * int32')))
+
+    def test_interning_cached_dshape(self):
+        from datashape.util import dshape_cache
+        s = '7 * {interned: int32}'
+        dshape(s)  # cached without interning
+        previous = set_interning(True)
+        try:
+            ds = dshape(s)
+            self.assertTrue(ds._interned)
+            self.assertTrue(dshape_cache.get((s, datashape.sym)) is ds)
+            self.assertTrue(dshape(s) is ds)
+        finally:
+            set_interning(previous)
+
+    def test_intern_race(self):
+        # Another thread interns an equal type between the lookup and
+        # the insertion into the table
+        from datashape import coretypes
+        winner = intern_type(DataShape(Fixed(7), Option(int32)))
+        loser = DataShape(Fixed(7), Option(int32))
+
+        class Racing(dict):
+            def get(self, key, default=None):
+                return None
+
+            def setdefault(self, key, value):
+                return winner
+        table, coretypes._intern_table = coretypes._intern_table, Racing()
+        try:
+            self.assertTrue(intern_type(loser) is winner)
+        finally:
+            coretypes._intern_table = table
+        self.assertFalse(getattr(loser, '_interned', False))
+        self.assertEqual(loser, winner)
+
+    def test_named_datashapes_are_not_interned(self):
+        ds = DataShape(int64, name='InternTestShape')
+        self.assertTrue(intern_type(ds) is ds)
+
+    def test_interning_mode(self):
+        previous = set_interning(True)
+        try:
+            self.assertTrue(dshape('var * {a: int32}') is
+                            dshape(DataShape(Var(), Record([('a', int32)]))))
+        finally:
+            set_interning(previous)
+        self.assertFalse(dshape(DataShape(Var(), int32)) is
+                         dshape(DataShape(Var(), int32)))
+
+
+class TestSlots(unittest.TestCase):
+    def test_no_instance_dict(self):
+        for ds in [Fixed(3), var, int32, string, Option(int32),
+                   Tuple([int32]), dshape('3 * {x: int32}'),
+                   dshape('3 * {x: int32}')[1]]:
+            self.assertFalse(hasattr(ds, '__dict__'), type(ds))
+
+    def test_leaf_state(self):
+        # Only the hash is cached on leaf types
+        for ds in [Fixed(3), var, int32, string]:
+            hash(ds)
+            self.assertFalse(hasattr(ds, '_str'), type(ds))
+            self.assertFalse(hasattr(ds, '_parameters'), type(ds))
+
+    def test_parameters(self):
+        self.assertEqual(Fixed(3).parameters, (3,))
+        self.assertEqual(int32.parameters, ('int32', 4, int32.c_alignment))
+        ds = dshape('3 * int32')
+        self.assertTrue(ds.parameters is ds.parameters)
+        self.assertEqual(Record([('x', int32)]).parameters,
+                         ((('x', DataShape(int32)),),))
+
+    def test_pickle_roundtrip(self):
+        ds = dshape('var * {a: int32, b: ?string, c: 3 * (int8, float64)}')
+        hash(ds)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            result = pickle.loads(pickle.dumps(ds, protocol))
+            self.assertEqual(result, ds)
+            self.assertEqual(hash(result), hash(ds))
+        self.assertEqual(pickle.loads(pickle.dumps(int32)), int32)
+
+    def test_pickle_canonical(self):
+        ds = dshape('var * {a: int32, b: string}')
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            result = pickle.loads(pickle.dumps(ds, protocol))
+            self.assertTrue(result is intern_type(ds))
+            self.assertTrue(result[0] is var)
+            self.assertTrue(result.measure['a'].measure is int32)
+            self.assertTrue(result.measure['b'].measure is string)
+        self.assertTrue(len(pickle.dumps(ds, pickle.HIGHEST_PROTOCOL)) < 100)
+
+    def test_pickle_custom_ctype(self):
+        # A ctype unknown to the loading process is recreated there
+        ds = DataShape(Fixed(2), CType('int24_pickled', 3, 1))
+        del Type._registry['int24_pickled']
+        code = ('import pickle, sys\n'
+                'ds = pickle.loads(sys.stdin.buffer.read()'
+                ' if hasattr(sys.stdin, "buffer") else sys.stdin.read())\n'
+                'print(ds, ds.measure.itemsize, ds.measure.c_alignment)')
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(
+            os.path.dirname(os.path.abspath(datashape.__file__))))
+        proc = subprocess.Popen([sys.executable, '-c', code], env=env,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        out, _ = proc.communicate(pickle.dumps(ds, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(proc.returncode, 0)
+        self.assertEqual(out.decode().split(), ['2', '*', 'int24_pickled',
+                                                '3', '1'])
+
+    def test_pickle_fallback(self):
+        # Named datashapes have no binary encoding
+        ds = DataShape(Fixed(3), int32, name='Triple')
+        result = pickle.loads(pickle.dumps(ds))
+        self.assertEqual(result, ds)
+        self.assertEqual(result.name, 'Triple')
@@ -1,7 +1,9 @@
 from __future__ import absolute_import, division, print_function
 
 import ctypes
+import gc
 import unittest
+import weakref
 
 import datashape
 from datashape import dshape, error
@@ -125,6 +127,19 @@ class TestDataShapeCreation(unittest.TestCase):
         self.assertEqual(shape, ())
         self.assertEqual(dt, np.dtype([('x', 'int32'), ('y', 'float32')]))
 
+    def test_to_numpy_cached(self):
+        from datashape.coretypes import _numpy_cache
+        ds = datashape.Record([('x', datashape.DataShape(datashape.int32)),
+                               ('y', datashape.DataShape(datashape.float32))])
+        dt = datashape.to_numpy_dtype(ds)
+        self.assertTrue(datashape.to_numpy_dtype(ds) is dt)
+        self.assertTrue(ds in _numpy_cache)
+        # The cache doesn't keep the type alive
+        ref = weakref.ref(ds)
+        del ds
+        gc.collect()
+        self.assertTrue(ref() is None)
+
     def test_syntax(self):
         self.assertEqual(datashape.Fixed(3) * dshape('int32'),
                          dshape('3 * int32'))
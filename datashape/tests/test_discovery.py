@@ -1,12 +1,20 @@
 import numpy as np
 
 from datashape.discovery import (discover, null, unite_identical, unite_base,
-        unite_merge_dimensions, do_one)
+        unite_merge_dimensions, do_one, discover_column,
+        discover_sample, Discoverer, lowest_common_dshape,
+        _lowest_common_dshape, toposorted)
 from datashape.coretypes import *
 from datashape.internal_utils import raises
-from datashape.py2help import skip
+from datashape.py2help import skip, skipIf
 from datashape import dshape
 
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
+
 def test_simple():
     assert discover(3) == int64
     assert discover(3.0) == float64
@@ -156,3 +164,138 @@ def test_big_discover():
 
 def test_unite_base():
     assert unite_base([date_, datetime_]) == 2 * datetime_
+
+
+def test_discover_column_matches_unite():
+    columns = [['1', '2', '3'],
+               ['1', '', '3'],
+               ['1', '2.5', None],
+               ['True', 'false', ''],
+               ['Alice', '1', ''],
+               ['2014-01-01', '2014-01-02 10:00:00'],
+               ['1', ' 7 ', '1e3', '.5', 'nan'],
+               ['', None],
+               [1, 2.0, 3],
+               [[1, 2], [1, 2, 3]]]
+    for column in columns:
+        expected = unite([discover(x) for x in column])
+        assert discover_column(column) == expected
+
+
+def test_discover_column_strings():
+    assert discover_column(['Alice', 'Bob', '']) == 3 * Option(string)
+    assert discover_column(['10', '', '20']) == 3 * Option(int64)
+    assert discover_column(['1', '1.0', '1']) == 3 * float64
+
+
+def test_discover_column_numpy():
+    assert discover_column(np.array([1, 2, 3], dtype='int32')) == 3 * int32
+    assert discover_column(np.array(['1', '2'])) == 2 * int64
+    assert discover_column(np.array(['1', None, 'a'], dtype=object)) == \
+            3 * Option(string)
+
+
+def test_discover_column_no_common_type():
+    assert discover_column([1 + 1j, 'Alice']) is None
+    assert discover_column([]) is None
+
+
+def test_discover_sample():
+    data = [(i, 'name%d' % i, float(i)) for i in range(1000)]
+    full = discover(data)
+    for strategy in ['head', 'reservoir', 'stratified']:
+        ds, inspected = discover_sample(data, 50, strategy, seed=1)
+        assert ds == full
+        assert inspected == 50
+        assert discover(data, sample=50, strategy=strategy, seed=1) == full
+
+
+def test_discover_sample_iterators():
+    rows = ((i, 'x') for i in range(100))
+    assert discover_sample(rows, 10) == (dshape('var * (int64, string)'), 10)
+    rows = ((i, 'x') for i in range(100))
+    assert (discover_sample(rows, 10, 'reservoir', seed=0) ==
+            (dshape('100 * (int64, string)'), 10))
+    assert discover_sample(iter([1, 2]), 10) == (dshape('2 * int64'), 2)
+    assert raises(TypeError,
+                  lambda: discover_sample(iter([1, 2, 3]), 2, 'stratified'))
+
+
+def test_discover_sample_falls_back_when_rows_differ():
+    data = [1, (1, 2), 1, 1]
+    assert discover_sample(data, 3, 'head') == (discover(data), 4)
+    assert raises(ValueError, lambda: discover_sample(iter([1, (1, 2)]), 2))
+    assert raises(ValueError, lambda: discover_sample(data, 2, 'random'))
+
+
+def test_discoverer_matches_discover():
+    mixed = [(i, str(i * 1.5), 'x' if i % 7 else '', i % 2 == 0)
+             for i in range(100)]
+    # Identical columns collapse into a dimension
+    strings = [('a' + str(i), 'b' + str(i)) for i in range(100)]
+    numbers = [(i, i * 2) for i in range(100)]
+    lists = [([i, i], [i, 2 * i]) for i in range(100)]
+    for data in [mixed, strings, numbers, lists]:
+        d = Discoverer()
+        for i in range(0, len(data), 16):
+            d.update(iter(data[i:i + 16]))
+        assert d.count == 100
+        assert d.result() == var * discover(data).subshape[0]
+
+
+def test_discoverer_done():
+    d = Discoverer()
+    assert d.result() is None
+    d.update([('a', 1), ('b', 2)])
+    assert not d.done
+    d.update([('c', 'd')])
+    assert d.done
+    d.update([(None, 'e')])
+    assert d.result() == dshape('var * (?string, string)')
+
+
+def test_discoverer_errors():
+    d = Discoverer()
+    d.update([(1, 2)])
+    assert raises(ValueError, lambda: d.update([(1, 2, 3)]))
+    assert raises(ValueError, lambda: d.update([1]))
+
+
+def test_lowest_common_dshape_join_table():
+    from itertools import combinations
+    for r in range(1, len(toposorted) + 1):
+        for dshapes in combinations(toposorted, r):
+            assert (lowest_common_dshape(dshapes) ==
+                    _lowest_common_dshape(dshapes))
+    assert lowest_common_dshape(iter([int32, int64, int32])) == int64
+    assert lowest_common_dshape([int32, Tuple([int32])]) is None
+
+
+@skipIf(futures is None, 'needs concurrent.futures')
+def test_discover_parallel_columns():
+    data = [(i, str(i), '' if i % 3 else 'x', i / 2.0, None)
+            for i in range(200)]
+    expected = discover(data)
+    with futures.ThreadPoolExecutor(3) as executor:
+        assert discover(data, executor=executor) == expected
+    assert discover(data, n_jobs=2) == expected
+
+
+def test_discover_exact_types_match_dispatch():
+    from multipledispatch import Dispatcher
+    assert discover.exact_types
+    for typ, ds in discover.exact_types.items():
+        example = None if typ is type(None) else typ(1)
+        assert Dispatcher.__call__(discover, example) == ds
+        assert discover(example) == ds
+
+
+def test_discover_exact_types_dropped_on_register():
+    from datashape.discovery import DiscoverDispatcher
+    d = DiscoverDispatcher('d')
+    d.add((object,), lambda x: string)
+    d.add_exact_types([1, True, 1.0])
+    assert d(True) == string
+    d.add((int,), lambda x: int64)
+    assert set(d.exact_types) == set([float])
+    assert d(True) == int64
@@ -149,5 +149,23 @@ class TestDataShapeLexer(unittest.TestCase):
                                ' \t # end'))
         self.assertEqual([(tok.id, tok.val) for tok in toks], expected_idval)
 
+    def test_tokenize(self):
+        ids, spans, vals, error_pos = lexer.tokenize(' {x: ?int32} # c')
+        self.assertEqual(ids, [lexer.LBRACE, lexer.NAME_LOWER, lexer.COLON,
+                               lexer.QUESTIONMARK, lexer.NAME_LOWER,
+                               lexer.RBRACE])
+        self.assertEqual(spans, [(1, 2), (2, 3), (3, 4), (5, 6), (6, 11),
+                                 (11, 12)])
+        self.assertEqual(vals, [None, 'x', None, None, 'int32', None])
+        self.assertEqual(error_pos, None)
+        # The tokens before an invalid one are kept
+        ids, spans, vals, error_pos = lexer.tokenize('3 * # c\n $x')
+        self.assertEqual(ids, [lexer.INTEGER, lexer.ASTERISK])
+        self.assertEqual(error_pos, 9)
+        toks = lexer.lex('3 * # c\n $x')
+        self.assertEqual(next(toks).val, 3)
+        self.assertEqual(next(toks).id, lexer.ASTERISK)
+        self.assertRaises(datashape.DataShapeSyntaxError, next, toks)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,12 +1,14 @@
 from __future__ import print_function, division, absolute_import
 
 import unittest
+from itertools import product
 
 from datashape.py2help import skip
 
 from datashape import dshape, dshapes
 from datashape import coretypes
 
+from datashape.error import OverloadError, CoercionError, UnificationError
 from datashape.overload_resolver import OverloadResolver
 
 
@@ -88,6 +90,74 @@ class TestOverloading(unittest.TestCase):
         self.assertEqual(match,
                          dshape('(3 * float64, 3 * float64) -> 3 * float64')[0])
 
+    def test_candidates_pruned(self):
+        ores = OverloadResolver('n')
+        ores.extend_overloads(['(A... * int32) -> A... * int32',
+                               '(3 * float64) -> 3 * float64',
+                               '(X * Y * string) -> X * string',
+                               '(X * T) -> X * T',
+                               '(int32, int32) -> int32'])
+        argstype = coretypes.Tuple([dshape('10 * int16')])
+        self.assertEqual(ores._find_candidates(argstype), (0, 1, 3))
+        self.assertEqual(ores.resolve_overload(argstype)[0], 3)
+        argstype = coretypes.Tuple([dshape('10 * 2 * float32')])
+        self.assertEqual(ores._find_candidates(argstype), ())
+        self.assertRaises(CoercionError, ores.resolve_overload, argstype)
+
+    def test_candidates_bounded(self):
+        ores = OverloadResolver('b', cache_size=2)
+        ores.extend_overloads(['(X * {x: int32}) -> X * int32',
+                               '(X * T) -> X * T'])
+        for n in range(5):
+            argstype = coretypes.Tuple([dshape('3 * string[%d]' % (n + 1))])
+            self.assertEqual(ores._find_candidates(argstype), (1,))
+        self.assertEqual(len(ores._candidates), 2)
+
+    def test_pruned_matches_full_scan(self):
+        measures = ['int8', 'int32', 'float32', 'float64', 'complex[float64]',
+                    'T']
+        dims = [[], ['A...'], ['X'], ['3'], ['X', 'Y'], ['var', '...']]
+        sigs = ['(%s, %s) -> int32' % (' * '.join(d1 + [m1]),
+                                       ' * '.join(d2 + [m2]))
+                for d1, m1, d2, m2 in product(dims[:4], measures,
+                                              dims[2:], measures[::2])]
+        ores = OverloadResolver('p')
+        ores.extend_overloads(sigs)
+        full = ores._by_arity[2].all
+        for a1, a2 in product(['int32', '3 * float32', '2 * 3 * int8',
+                               'var * float64'],
+                              ['3 * float64', '3 * 10 * int8', 'int32']):
+            argstype = coretypes.Tuple([dshape(a1), dshape(a2)])
+            expected, err = ores._match_overloads(argstype, full, None)
+            try:
+                result = ores.resolve_overload(argstype)
+            except (OverloadError, CoercionError, UnificationError) as e:
+                if len(expected) == 1:
+                    raise
+                self.assertEqual(type(e),
+                                 OverloadError if expected or err is None
+                                 else type(err))
+            else:
+                self.assertEqual([result], expected)
+
+    def test_resolution_cache(self):
+        ores = OverloadResolver('q', cache_size=2)
+        ores.extend_overloads(['(A... * float32) -> A... * float32',
+                               '(A... * float64) -> A... * float64'])
+        args = coretypes.Tuple([dshape('3 * int32')])
+        result = ores.resolve_overload(args)
+        self.assertEqual(ores.resolve_overload(args), result)
+        self.assertEqual(ores.cache_info()[:2], (1, 1))
+        bad = coretypes.Tuple([dshape('3 * complex[float64]')])
+        for _ in range(2):
+            self.assertRaises(CoercionError, ores.resolve_overload, bad)
+        self.assertEqual(ores.cache_info(), (2, 2, 2, 2))
+        # New overloads invalidate the cache
+        ores.extend_overloads(['(A... * complex[float64]) -> A... * int8'])
+        self.assertEqual(ores.cache_info(), (0, 0, 2, 0))
+        self.assertEqual(ores.resolve_overload(bad)[0], 2)
+
+
 if __name__ == '__main__':
     #TestOverloading('test_best_match_broadcasting').debug()
     unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+import datashape
+from datashape import dshape, serialization
+from datashape.coretypes import (Mono, DataShape, Record, CType, Ellipsis,
+                                 TypeVar, IntegerConstant, StringConstant,
+                                 Type, Units, Fixed, int32, float64)
+from datashape.serialization import dumps, loads
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        serialization.loads_cache.clear()
+
+    def test_roundtrip(self):
+        for s in ['int32', '10 * float64', 'var * string', '?datetime',
+                  '3 * 4 * complex[float64]', 'string[30, "A"]',
+                  'string["U16"]', 'date', 'time', 'json',
+                  'datetime[tz="UTC"]', 'time[tz="Europe/Paris"]',
+                  'var * {name: string, amount: ?int64, id: int32}',
+                  '10 * var * {x: {x: int8, y: int8}, y: ?{x: int8}}',
+                  'var * (int32, string, ?float64)',
+                  '{"first name": string, "é": bool}',
+                  '(A... * float32, A... * float32) -> A... * float32',
+                  '(M * N * float64, N * K * float64) -> M * K * float64',
+                  'T * ... * int32', '1000000 * 0 * uint16',
+                  'units["second"]', 'units["meter", int32]']:
+            ds = dshape(s)
+            data = ds.to_bytes()
+            self.assertTrue(isinstance(data, bytes))
+            result = Mono.from_bytes(data)
+            self.assertEqual(result, ds)
+            self.assertEqual(str(result), str(ds))
+
+    def test_other_types(self):
+        for ds in [Ellipsis(), Ellipsis(TypeVar('A')), TypeVar('T'),
+                   datashape.null, IntegerConstant(-3), IntegerConstant(500),
+                   StringConstant('abc'), datashape.bytes_,
+                   Units('m', DataShape(int32)),
+                   Record([('x', DataShape(Fixed(2), float64))])]:
+            self.assertEqual(loads(dumps(ds)), ds)
+
+    def test_named_ctype(self):
+        ct = CType('int24', 3, 1)
+        try:
+            self.assertTrue(loads(dumps(DataShape(ct))).measure is ct)
+        finally:
+            del Type._registry['int24']
+
+    def test_unregistered_ctype(self):
+        ct = CType('int24', 3, 1)
+        data = dumps(DataShape(ct))
+        del Type._registry['int24']
+        result = loads(data).measure
+        self.assertEqual(result, ct)
+        self.assertEqual((result.itemsize, result.c_alignment), (3, 1))
+        self.assertFalse('int24' in Type._registry)
+
+    def test_compact(self):
+        ds = dshape('var * {a: {x: int32, y: int32}, b: {x: int32, y: int32}}')
+        data = dumps(ds)
+        self.assertTrue(len(data) < len(str(ds)))
+        # Field names are only stored once
+        self.assertEqual(data.count(b'x'), 1)
+
+    def test_from_bytes_type(self):
+        data = dshape('3 * int32').to_bytes()
+        self.assertEqual(DataShape.from_bytes(data), dshape('3 * int32'))
+        self.assertRaises(TypeError, Record.from_bytes, data)
+
+    def test_cache(self):
+        data = dumps(dshape('3 * int32'))
+        self.assertTrue(loads(data) is loads(bytearray(data)))
+
+    def test_invalid(self):
+        data = dumps(dshape('var * {x: int32}'))
+        for bad in [b'', b'\x00' + data[1:], data[:-1], data + b'\x00',
+                    data[:2] + b'\xff' + data[3:]]:
+            self.assertRaises(ValueError, loads, bad)
+        self.assertRaises(TypeError, dumps, 'int32')
+
+
+if __name__ == '__main__':
+    unittest.main()
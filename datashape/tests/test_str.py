@@ -52,6 +52,16 @@ class TestDataShapeStr(unittest.TestCase):
         self.assertEqual(repr(dshape('3*5*int16')),
                         'dshape("3 * 5 * int16")')
 
+    def test_escaped_repr(self):
+        self.assertEqual(repr(dshape(u'{"\u00e9": int32, b: int8}')),
+                         'dshape("{ \\xe9 : int32, b : int8 }")')
+
+    def test_str_cached(self):
+        ds = dshape('var * {x: ?int32, y: (int8, string)}')
+        self.assertTrue(str(ds) is str(ds))
+        self.assertTrue(str(ds.measure) is str(ds.measure))
+        self.assertEqual(str(datashape.Record([])), '{  }')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -52,8 +52,216 @@ def test_issubschema():
     assert issubschema('2 * int', '2 * int')
     assert not issubschema('2 * int', '3 * int')
 
-    # assert issubschema('float32', 'real')
+    assert issubschema('float32', 'real')
+
+
+def test_issubschema_numeric():
+    assert issubschema('int8', 'int64')
+    assert issubschema('uint8', 'int16')
+    assert issubschema('int32', 'float64')
+    assert not issubschema('int64', 'float64')
+    assert not issubschema('int64', 'int32')
+    assert not issubschema('int32', 'bool')
+
+
+def test_issubschema_dims():
+    assert issubschema('3 * int32', 'var * int32')
+    assert not issubschema('var * int32', '3 * int32')
+    assert not issubschema('3 * int32', 'int32')
+    assert issubschema('3 * 3 * int32', 'N * N * int64')
+    assert not issubschema('3 * 4 * int32', 'N * N * int32')
+    assert issubschema('3 * 4 * int32', '... * 4 * int32')
+    assert issubschema('int32', '... * int32')
+
+
+def test_issubschema_structural():
+    assert issubschema('int32', '?int32')
+    assert issubschema('?int8', '?float64')
+    assert not issubschema('?int32', 'int32')
+    assert issubschema('{x: int32, y: string}', '{x: int64}')
+    assert not issubschema('{x: int32}', '{x: int32, y: int32}')
+    assert issubschema('var * {a: 3 * int8, b: ?{c: int8, d: date}}',
+                       'var * {b: ?{c: float32}}')
+    assert issubschema('(int8, string[3, "A"])', '(int16, string)')
+    assert not issubschema('(int8, string)', '(int8, string[3])')
+    assert not issubschema('(int8, int8)', '(int8, int8, int8)')
+
+
+def test_issubschema_cached():
+    from datashape.user import issubschema_cache
+    issubschema_cache.clear()
+    a, b = dshape('10 * {x: int32}'), dshape('var * {x: ?int64}')
+    assert issubschema(a, b)
+    assert issubschema_cache.get((a, b)) is True
+    assert issubschema_cache.get((a.measure, b.measure)) is True
+
 
 def test_integration():
     assert validate('{name: string, arrived: date}',
                     {'name': 'Alice', 'arrived': date(2012, 1, 5)})
+
+
+def test_compile_validator():
+    v = compile_validator('var * {x: int32, y: float64, z: 2 * uint8}')
+    assert compile_validator(dshape('var * {x: int32, y: float64, '
+                                    'z: 2 * uint8}')) is v
+    assert v([])
+    assert v([{'x': 1, 'y': 2.0, 'z': [1, 2]}, (3, 4.0, (5, 6))])
+    assert not v([{'x': 1, 'y': 2.0, 'z': [1, -2]}])
+    assert not v([{'x': 1, 'y': 2.0, 'z': [1, 2, 3]}])
+    assert not v([(1, 2.0)])
+    assert not v({'x': 1, 'y': 2.0, 'z': [1, 2]})
+
+
+def test_compile_validator_scalars():
+    assert compile_validator('int64')(np.int64(1))
+    assert compile_validator('int64')(np.int32(1))
+    assert not compile_validator('int32')(np.int64(1))
+    assert compile_validator('float64')(np.float32(1))
+    assert not compile_validator('int32')(True)
+    assert compile_validator('bool')(True)
+    assert compile_validator('float32')(1.5)
+    assert not compile_validator('float32')(1)
+    assert compile_validator('complex[float64]')(1j)
+    assert compile_validator('(int32, string)')((1, 'a'))
+    assert not compile_validator('(int32, string)')((1, 2))
+    assert compile_validator('datetime')(datetime(2000, 1, 1))
+    assert not compile_validator('datetime')(date(2000, 1, 1))
+    assert not compile_validator('json')({})
+
+
+def test_validate_int_range():
+    assert validate('int8', 127)
+    assert not validate('int8', 1000)
+    assert not validate('var * int8', [1, 1000])
+    assert validate('uint8', 255)
+    assert not validate('uint8', 300)
+    assert not validate('uint8', -1)
+    assert validate('uint64', 2 ** 64 - 1)
+
+
+def test_validate_fixlen_string():
+    assert validate('string[3]', 'abc')
+    assert not validate('string[3]', 'abcdef')
+    assert validate('string', 'abcdef')
+
+
+def test_validate_numpy_scalars():
+    assert validate('2 * int64', [np.int32(1), np.int32(2)])
+    assert validate('2 * int64', np.array([1, 2], dtype='int32'))
+    assert not validate('2 * int32', [np.int64(1), np.int64(2)])
+
+
+def test_validate_option():
+    v = compile_validator('var * {x: int32, y: ?float64}')
+    assert v([{'x': 1, 'y': None}, {'x': 2, 'y': 2.5}])
+    assert not v([{'x': None, 'y': 1.0}])
+    assert validate('?string', None)
+    assert not validate('string', None)
+
+
+def test_invalid_rows():
+    x = np.array([[1, 2], [3, 4], [5, 2 ** 40]])
+    assert invalid_rows('3 * 2 * int32', x).tolist() == [False, False, True]
+    assert invalid_rows('var * 3 * int32', x).all()
+    assert invalid_rows('4 * 2 * int32', x).all()
+    assert not invalid_rows('var * 2 * int64', x.astype('int8')).any()
+    assert invalid_rows('var * uint8', np.array([1, -1, 256])).tolist() == \
+        [False, True, True]
+    assert invalid_rows('var * string[3]',
+                        np.array(['ab', 'abcd'])).tolist() == [False, True]
+    assert validate('2 * int64', np.array([1, 2], dtype='int32'))
+
+
+def test_invalid_rows_nulls():
+    x = np.array([1.5, np.nan])
+    # NaN is a float, but not an int
+    assert not invalid_rows('var * float64', x).any()
+    assert validate('2 * float64', x)
+    assert invalid_rows('var * int64', np.array([1.0, np.nan])).tolist() == \
+        [False, True]
+    assert not invalid_rows('var * ?float64', x).any()
+    assert invalid_rows('var * ?int32', x).tolist() == [True, False]
+    m = np.ma.masked_array([1, 2, 3], mask=[False, True, False])
+    assert invalid_rows('var * int32', m).tolist() == [False, True, False]
+    assert not invalid_rows('var * ?int32', m).any()
+    t = np.array(['2000-01-01', 'NaT'], dtype='M8[s]')
+    assert invalid_rows('var * datetime', t).tolist() == [False, True]
+    assert not invalid_rows('var * ?datetime', t).any()
+
+
+def test_invalid_rows_matches_scalars():
+    # Infinities fit any float type, finite overflows don't
+    x = np.array([np.inf, 1.0, -np.inf, 1e300])
+    assert invalid_rows('var * float32', x).tolist() == \
+        [False, False, False, True]
+    assert validate('float32', float('inf'))
+    assert not validate('float32', 1e300)
+    assert validate('float64', 1e300)
+    # Bools are not ints
+    assert not validate('1 * int32', np.array([True]))
+    assert not validate('int32', True)
+    assert validate('1 * bool', np.array([True]))
+    # Complex values are range checked like floats
+    z = np.array([1 + 1j, 1e300j, complex(np.inf, 0)])
+    assert invalid_rows('var * complex[float32]', z).tolist() == \
+        [False, True, False]
+    assert not validate('complex[float32]', 1e300j)
+    assert validate('complex[float32]', 1j)
+
+
+def test_invalid_rows_records():
+    x = np.array([(1, 2.5, [1, 2]), (-3, np.nan, [3, 4])],
+                 dtype=[('a', 'i8'), ('b', 'f8'), ('c', 'i4', (2,))])
+    assert invalid_rows('var * {a: int8, b: ?float32, c: 2 * int16}',
+                        x).tolist() == [False, False]
+    assert invalid_rows('var * {a: uint8, b: ?float32}',
+                        x).tolist() == [False, True]
+    assert invalid_rows('var * {a: int8, d: int8}', x).all()
+    assert invalid_rows('var * {a: int8, c: 3 * int16}', x).all()
+
+
+def test_invalid_rows_objects():
+    x = np.array([{'a': 1, 'b': 'x'}, {'a': 1}, None], dtype=object)
+    assert invalid_rows('var * {a: int32, b: string}', x).tolist() == \
+        [False, True, True]
+    assert invalid_rows('var * ?{a: int32, b: string}', x).tolist() == \
+        [False, True, False]
+    x = np.empty(3, dtype=object)
+    x[:] = [[1, 2], [3, 'x'], []]
+    assert invalid_rows('var * var * int64', x).tolist() == \
+        [False, True, False]
+    assert invalid_rows('var * int64', np.arange(3.0)[:, None]).all()
+
+
+def test_validate_rows():
+    rows = [{'id': 1, 'name': 'Alice', 'pos': [1.0, 2.0]},
+            {'id': 'two', 'name': 'Bob', 'pos': [1.0, 'x']},
+            (3, 'Charlie', [0.5, 0.5]),
+            {'id': 4, 'pos': [1.0]},
+            (5, 'Dan'),
+            None]
+    schema = 'var * {id: int64, name: string, pos: 2 * float64}'
+    errors = validate_rows(schema, rows)
+    assert [(e.index, e.path, str(e.expected)) for e in errors] == [
+        (1, ('id',), 'int64'),
+        (1, ('pos', 1), 'float64'),
+        (3, ('name',), 'string'),
+        (3, ('pos',), '2 * float64'),
+        (4, (), '{ id : int64, name : string, pos : 2 * float64 }'),
+        (5, (), '{ id : int64, name : string, pos : 2 * float64 }')]
+    # The schema of one row, and a generator of rows
+    errors = validate_rows(dshape(schema).measure, iter(rows))
+    assert sorted(set(e.index for e in errors)) == [1, 3, 4, 5]
+
+    assert len(validate_rows(schema, rows, max_errors=3)) == 3
+    assert [e.index for e in validate_rows(schema, rows, fail_fast=True)] == \
+        [1, 1]
+    assert validate_rows(schema, rows[:1] * 10) == []
+
+
+def test_validate_rows_nested():
+    rows = [[1, None, 3], [1, 2, 'x'], [[1]]]
+    errors = validate_rows('var * var * ?int32', rows)
+    assert [(e.index, e.path) for e in errors] == [(1, (2,)), (2, (0,))]
+    assert str(errors[0].expected) == '?int32'
@@ -1,7 +1,11 @@
+import subprocess
+import sys
 import unittest
 
 import datashape
 from datashape import dshape, has_var_dim, has_ellipsis
+from datashape.util import dshape_cache, clear_cache, dshapes_bulk
+from datashape.internal_utils import LRUCache
 
 
 class TestDataShapeUtil(unittest.TestCase):
@@ -86,6 +90,121 @@ class TestDataShapeUtil(unittest.TestCase):
 
         self.assertFalse(fail, msg)
 
+    def test_dshape_cache(self):
+        clear_cache()
+        a = dshape('var * {name: string, amount: int32}')
+        b = dshape('var * {name: string, amount: int32}')
+        self.assertTrue(a is b)
+        info = dshape_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+        clear_cache()
+        self.assertEqual(len(dshape_cache), 0)
+        self.assertFalse(dshape('var * {name: string, amount: int32}') is a)
+        self.assertEqual(dshape('var * {name: string, amount: int32}'), a)
+
+    def test_dshape_cache_skips_errors(self):
+        clear_cache()
+        self.assertRaises(datashape.DataShapeSyntaxError, dshape, '3 * ')
+        self.assertEqual(len(dshape_cache), 0)
+
+
+    def test_dshapes_bulk(self):
+        strings = ['var * {a: int32, b: string}', '3 * $', '10 * int32',
+                   'var * {a: int32, b: string}', '{a: int32, b: string}',
+                   '3 * int33']
+        for dedupe in [True, False]:
+            results, errors = dshapes_bulk(strings, dedupe=dedupe)
+            self.assertEqual(results[0], dshape(strings[0]))
+            self.assertEqual(results[2], dshape('10 * int32'))
+            self.assertEqual(results[1], None)
+            self.assertEqual(results[5], None)
+            self.assertEqual([i for i, e in errors], [1, 5])
+            self.assertTrue(isinstance(errors[0][1],
+                                       datashape.DataShapeSyntaxError))
+            # Equal types and sub-types are shared between results
+            self.assertTrue(results[0] is results[3])
+            self.assertTrue(results[0].measure is results[4].measure)
+
+    def test_dshapes_bulk_non_strings(self):
+        results, errors = dshapes_bulk([datashape.int32, '3 * int32', 1])
+        self.assertEqual(results[:2], [dshape('int32'), dshape('3 * int32')])
+        self.assertEqual(results[2], None)
+        self.assertEqual(errors[0][0], 2)
+        self.assertTrue(isinstance(errors[0][1], TypeError))
+
+    def test_dshapes_bulk_workers(self):
+        strings = ['%d * int32' % i for i in range(20)] + ['3 * $']
+        results, errors = dshapes_bulk(strings, workers=2)
+        self.assertEqual(results[:20], [dshape(s) for s in strings[:20]])
+        self.assertEqual([i for i, e in errors], [20])
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+        cache.maxsize = 1
+        self.assertEqual(len(cache), 1)
+        self.assertTrue('c' in cache)
+
+    def test_counters(self):
+        cache = LRUCache(4)
+        self.assertEqual(cache.get('a'), None)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('a')
+        self.assertEqual(cache.info(), (2, 1, 4, 1))
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 4, 0))
+
+    def test_invalid_maxsize(self):
+        self.assertRaises(ValueError, LRUCache, 0)
+
+
+
+class TestLazyImports(unittest.TestCase):
+    @unittest.skipIf(sys.version_info < (3, 7), 'needs module __getattr__')
+    def test_parsing_skips_heavy_imports(self):
+        code = ('import sys, datashape; datashape.dshape("3 * int32"); '
+                'print(" ".join(sorted(m for m in ["numpy", "dateutil", '
+                '"multipledispatch", "datashape.discovery"] '
+                'if m in sys.modules)))')
+        out = subprocess.check_output([sys.executable, '-c', code],
+                                      universal_newlines=True)
+        self.assertEqual(out.strip(), '')
+
+    def test_lazy_attributes(self):
+        from datashape.discovery import discover
+        from datashape.coercion import coercion_cost
+        self.assertIs(datashape.discover, discover)
+        self.assertIs(datashape.coercion_cost, coercion_cost)
+        self.assertIn('discover', dir(datashape))
+        self.assertRaises(AttributeError, getattr, datashape, 'nonexistent')
+
+    def test_lazy_exports_match_submodules(self):
+        for module, names in datashape._lazy_all.items():
+            submodule = getattr(datashape, module.lstrip('.'))
+            self.assertEqual(names, submodule.__all__)
+        for module, names in datashape._lazy_some.items():
+            submodule = getattr(datashape, module.lstrip('.'))
+            for name in names:
+                self.assertTrue(hasattr(submodule, name))
+
+    def test_star_import(self):
+        namespace = {}
+        exec('from datashape import *', namespace)
+        self.assertIs(namespace['RowError'], datashape.RowError)
+        self.assertIs(namespace['validate'], datashape.validate)
+        self.assertIs(namespace['dshape'], dshape)
+        for name in ['sys', 'import_module', 'np', 'weakref']:
+            self.assertNotIn(name, namespace)
+
+
 if __name__ == '__main__':
     unittest.main()
-
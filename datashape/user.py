@@ -2,107 +2,588 @@ from __future__ import print_function, division, absolute_import
 from datashape.dispatch import dispatch
 from .coretypes import *
 from .util import dshape
-import sys
+from .coercion import lossless_coercion
+from .internal_utils import LRUCache
+from .py2help import _inttypes, _strtypes, imap
+import operator
+from collections import namedtuple
 from datetime import date, time, datetime
+from itertools import compress, tee
 
+import numpy as np
 
-__all__ = ['validate', 'issubschema']
+
+__all__ = ['validate', 'issubschema', 'compile_validator', 'invalid_rows',
+           'validate_rows', 'RowError']
 
 
 basetypes = np.generic, int, float, str, date, time, datetime
 
+inf = float('inf')
+
 
 @dispatch(np.dtype, basetypes)
 def validate(schema, value):
     return np.issubdtype(type(value), schema)
 
 
-@dispatch(CType, basetypes)
+@dispatch(Mono, object)
 def validate(schema, value):
-    return validate(to_numpy_dtype(schema), value)
+    return compile_validator(schema)(value)
 
 
-@dispatch(DataShape, (tuple, list))
+@dispatch(str, object)
 def validate(schema, value):
-    head = schema[0]
-    return ((len(schema) == 1 and validate(head, value))
-        or (isdimension(head)
-       and (isinstance(head, Var) or int(head) == len(value))
-       and all(validate(DataShape(*schema[1:]), item) for item in value)))
+    return compile_validator(dshape(schema))(value)
 
 
-@dispatch(DataShape, object)
+@dispatch(type, object)
 def validate(schema, value):
-    if len(schema) == 1:
-        return validate(schema[0], value)
+    return isinstance(value, schema)
 
 
-@dispatch(Record, dict)
-def validate(schema, d):
-    return all(validate(sch, d.get(k)) for k, sch in schema.parameters[0])
+@dispatch(tuple, object)
+def validate(schemas, value):
+    return any(validate(schema, value) for schema in schemas)
 
 
-@dispatch(String, str)
+@dispatch(object, object)
 def validate(schema, value):
-    return True
+    return False
 
 
-@dispatch(Record, (tuple, list))
-def validate(schema, seq):
-    return all(validate(sch, item) for (k, sch), item
-                                    in zip(schema.parameters[0], seq))
+@dispatch(object, object)
+def issubschema(a, b):
+    return issubschema(dshape(a), dshape(b))
 
 
-@dispatch(str, object)
-def validate(schema, value):
-    return validate(dshape(schema), value)
+@dispatch(Mono, Mono)
+def issubschema(a, b):
+    """
+    Whether every value of type ``a`` is also a value of type ``b``.
 
+    Numbers may widen where the coercion table says no information is
+    lost, fixed dimensions fit variable ones, ``T`` fits ``?T``, and a
+    record fits another with a subset of its fields.  Types are compared
+    structurally, recursing into records, tuples and options.
 
-@dispatch(type, object)
-def validate(schema, value):
-    return isinstance(value, schema)
+    >>> issubschema('10 * {x: int32, y: float32}', 'var * {x: float64}')
+    True
+    >>> issubschema('var * int32', '10 * int32')
+    False
+    """
+    return _issubschema(a, b)
 
 
-@dispatch(tuple, object)
-def validate(schemas, value):
-    return any(validate(schema, value) for schema in schemas)
+# Results keyed on the (immutable) pair of types
+issubschema_cache = LRUCache(maxsize=4096)
 
 
-@dispatch(object, object)
-def validate(schema, value):
-    return False
+def _issubschema(a, b):
+    key = a, b
+    result = issubschema_cache.get(key)
+    if result is None:
+        result = _subtype(a, b)
+        issubschema_cache.put(key, result)
+    return result
 
 
-@dispatch(Time, time)
-def validate(schema, value):
-    return True
+def _split(ds):
+    """ The dimensions and the measure of a type """
+    if isinstance(ds, DataShape):
+        return ds.shape, ds.measure
+    return (), ds
 
 
-@dispatch(Date, date)
-def validate(schema, value):
+def _subtype(a, b):
+    if a == b:
+        return True
+    if isinstance(a, DataShape) or isinstance(b, DataShape):
+        adims, a = _split(a)
+        bdims, b = _split(b)
+        if adims or bdims:
+            return _subdims(adims, bdims) and _issubschema(a, b)
+    if isinstance(b, Option):
+        if isinstance(a, Option):
+            return _issubschema(a.ty, b.ty)
+        return isinstance(a, Null) or _issubschema(a, b.ty)
+    if isinstance(a, CType) and isinstance(b, CType):
+        return lossless_coercion(a, b)
+    if isinstance(a, Record) and isinstance(b, Record):
+        fields = a.fields
+        return all(name in fields and _issubschema(fields[name], t)
+                   for name, t in zip(b.names, b.types))
+    if isinstance(a, Tuple) and isinstance(b, Tuple):
+        return (len(a.dshapes) == len(b.dshapes) and
+                all(imap(_issubschema, a.dshapes, b.dshapes)))
+    if isinstance(a, String) and isinstance(b, String):
+        return ((b.fixlen is None or
+                 a.fixlen is not None and a.fixlen <= b.fixlen) and
+                (a.encoding == b.encoding or a.encoding == 'A'))
+    return a == b
+
+
+def _subdims(adims, bdims):
+    """ Whether the dimensions ``adims`` fit the dimensions ``bdims`` """
+    ellipses = [i for i, dim in enumerate(bdims) if isinstance(dim, Ellipsis)]
+    if ellipses:
+        # The ellipsis takes up whatever is left between its neighbours
+        i = ellipses[0]
+        before, after = bdims[:i], bdims[i + 1:]
+        if len(adims) < len(before) + len(after):
+            return False
+        adims = adims[:len(before)] + adims[len(adims) - len(after):]
+        bdims = before + after
+    elif len(adims) != len(bdims):
+        return False
+    bound = {}
+    for a, b in zip(adims, bdims):
+        if isinstance(b, TypeVar):
+            # Every occurrence of a type variable stands for the same size
+            if isinstance(a, Ellipsis) or bound.setdefault(b, a) != a:
+                return False
+        elif not (a == b or isinstance(a, Fixed) and isinstance(b, Var)):
+            return False
     return True
 
 
-@dispatch(DateTime, datetime)
-def validate(schema, value):
-    return True
+#------------------------------------------------------------------------
+# Compiled validators
+#------------------------------------------------------------------------
 
+# Validators keyed on their (immutable) schema
+validator_cache = LRUCache(maxsize=1024)
 
-@dispatch(DataShape, np.ndarray)
-def validate(schema, value):
-    return issubschema(from_numpy(value.shape, value.dtype), schema)
 
+def compile_validator(schema):
+    """
+    Compile a schema into a function of one value, which returns
+    whether the value matches the schema.
 
-@dispatch(object, object)
-def issubschema(a, b):
-    return issubschema(dshape(a), dshape(b))
+    The schema is walked once, so that validating many values against
+    it does no dispatch or allocation per value.  Python ints match the
+    integer types whose range holds them and floats match any floating
+    point type, while NumPy scalars need a dtype which casts safely.
 
+    >>> is_point = compile_validator('var * {x: int32, y: float64}')
+    >>> is_point([{'x': 1, 'y': 2.0}, {'x': 3, 'y': 4.5}])
+    True
+    >>> is_point([{'x': 1, 'y': 'two'}])
+    False
+    """
+    if isinstance(schema, _strtypes):
+        schema = dshape(schema)
+    validator = validator_cache.get(schema)
+    if validator is None:
+        validator = _compile(schema)
+        validator_cache.put(schema, validator)
+    return validator
+
+
+def _always(value):
+    return True
+
+
+def _never(value):
+    return False
 
-@dispatch(DataShape, DataShape)
-def issubschema(a, b):
-    if a == b:
-        return True
-    # TODO, handle cases like float < real
-    # TODO, handle records {x: int, y: int, z: int} < {x: int, y: int}
 
-    return None  # We don't know, return something falsey
+def _compile(schema):
+    if isinstance(schema, DataShape):
+        return _compile_datashape(schema)
+    elif isinstance(schema, CType):
+        return _compile_ctype(schema)
+    elif isinstance(schema, Record):
+        return _compile_record(schema)
+    elif isinstance(schema, Tuple):
+        return _compile_tuple(schema)
+    elif isinstance(schema, String):
+        return _compile_string(schema)
+    elif isinstance(schema, DateTime):
+        return lambda value: isinstance(value, datetime)
+    elif isinstance(schema, Date):
+        return lambda value: isinstance(value, date)
+    elif isinstance(schema, Time):
+        return lambda value: isinstance(value, time)
+    elif isinstance(schema, Option):
+        check = _element_validator(schema.ty)
+        return lambda value: value is None or check(value)
+    elif isinstance(schema, Null):
+        return lambda value: value is None
+    return _never
+
+
+def _element_validator(ds):
+    """ Validator for an element of a container of type ``ds`` """
+    # Elements aren't arrays, so skip the array check of a bare measure
+    if isinstance(ds, DataShape) and len(ds) == 1:
+        return compile_validator(ds[0])
+    return compile_validator(ds)
+
+
+def _compile_datashape(schema):
+    if len(schema) == 1:
+        check = compile_validator(schema[0])
+    else:
+        check = _compile_dims(schema)
+
+    def validate_datashape(value):
+        if isinstance(value, np.ndarray):
+            if value.ndim and len(schema) > 1:
+                return not invalid_rows(schema, value).any()
+            return bool(issubschema(from_numpy(value.shape, value.dtype),
+                                    schema))
+        return check(value)
+    return validate_datashape
+
+
+def _compile_dims(schema):
+    dim = schema[0]
+    item = _element_validator(DataShape(*schema[1:]))
+    if isinstance(dim, Var):
+        def validate_var(value):
+            return isinstance(value, (list, tuple)) and all(map(item, value))
+        return validate_var
+    elif isinstance(dim, Fixed):
+        size = dim.val
+
+        def validate_fixed(value):
+            return (isinstance(value, (list, tuple)) and
+                    len(value) == size and all(map(item, value)))
+        return validate_fixed
+    return _never
+
+
+# The dtype kinds matched by each Python scalar type
+_python_kinds = dict([(bool, 'b'), (float, 'f'), (complex, 'c')] +
+                     [(t, 'iu') for t in _inttypes])
+
+
+def _compile_ctype(schema):
+    dtype = to_numpy_dtype(schema)
+    if dtype.kind == 'O':
+        return _always
+    accepted = tuple(t for t, kinds in _python_kinds.items()
+                     if dtype.kind in kinds)
+    lo = hi = fmax = None
+    if dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        lo, hi = int(info.min), int(info.max)
+    elif dtype.kind in 'fc' and dtype != np.float64 and dtype != np.complex128:
+        # Python floats are doubles, narrower types can overflow
+        fmax = float(np.finfo(dtype).max)
+
+    def validate_ctype(value):
+        tp = type(value)
+        if tp in accepted:
+            if lo is not None:
+                return lo <= value <= hi
+            elif fmax is not None:
+                # Infinities and NaN fit any floating point type
+                return (not fmax < abs(value.real) < inf and
+                        not fmax < abs(value.imag) < inf)
+            return True
+        return (isinstance(value, np.generic) and
+                np.can_cast(tp, dtype, casting='safe'))
+    return validate_ctype
+
+
+def _compile_string(schema):
+    fixlen = schema.fixlen
+    if fixlen is None:
+        return lambda value: isinstance(value, _strtypes)
+    return lambda value: isinstance(value, _strtypes) and len(value) <= fixlen
+
+
+def _compile_record(schema):
+    names = tuple(schema.names)
+    checks = tuple(_element_validator(t) for t in schema.types)
+    fields = tuple(zip(names, checks))
+    nfields = len(fields)
+
+    def validate_record(value):
+        if isinstance(value, dict):
+            get = value.get
+            for name, check in fields:
+                if not check(get(name)):
+                    return False
+            return True
+        elif isinstance(value, (tuple, list)) and len(value) == nfields:
+            for check, item in zip(checks, value):
+                if not check(item):
+                    return False
+            return True
+        return False
+    return validate_record
+
+
+def _compile_tuple(schema):
+    checks = tuple(_element_validator(t) for t in schema.dshapes)
+    n = len(checks)
+
+    def validate_tuple(value):
+        return (isinstance(value, (tuple, list)) and len(value) == n and
+                all(check(item) for check, item in zip(checks, value)))
+    return validate_tuple
+
+
+#------------------------------------------------------------------------
+# Batch validation
+#------------------------------------------------------------------------
+
+RowError = namedtuple('RowError', 'index, path, expected')
+
+
+def validate_rows(schema, rows, max_errors=None, fail_fast=False):
+    """
+    Validate each of an iterable of rows in a single pass, and report
+    where the invalid ones fail.
+
+    ``schema`` is the datashape of one row, or of the whole collection,
+    e.g. ``var * {...}``, in which case the leading dimension is not
+    checked against the number of rows.  Returns a list of
+    ``RowError(index, path, expected)``, one for each value that doesn't
+    match, where ``path`` is the tuple of field names and sequence
+    indices leading to the value from its row, and ``expected`` is the
+    datashape it should have matched.  At most ``max_errors`` errors are
+    returned, and with ``fail_fast`` only those of the first invalid row.
+
+    >>> rows = [{'x': 1, 'y': 'a'}, {'x': 'b', 'y': 'c'}, {'x': 2}]
+    >>> for error in validate_rows('var * {x: int32, y: string}', rows):
+    ...     print(error.index, error.path, error.expected)
+    1 ('x',) int32
+    2 ('y',) string
+    """
+    if isinstance(schema, _strtypes):
+        schema = dshape(schema)
+    if isinstance(schema, DataShape) and len(schema) > 1:
+        schema = DataShape(*schema[1:])
+    check = _element_validator(schema)
+    if isinstance(schema, DataShape) and len(schema) == 1:
+        schema = schema[0]
+
+    # Only the failing rows come out of this, the loop over the valid
+    # ones runs in C
+    rows, checked = tee(rows)
+    failing = compress(enumerate(rows),
+                       imap(operator.not_, imap(check, checked)))
+    errors = []
+    for index, row in failing:
+        for path, expected in _diagnose(schema, row, ()):
+            errors.append(RowError(index, path, expected))
+            if max_errors is not None and len(errors) >= max_errors:
+                return errors
+        if fail_fast:
+            break
+    return errors
+
+
+def _diagnose(schema, value, path):
+    """
+    Yields ``(path, expected)`` for the values inside ``value`` which
+    don't match ``schema``, which ``value`` is known not to match.
+    """
+    if isinstance(schema, DataShape):
+        if len(schema) == 1:
+            for error in _diagnose(schema[0], value, path):
+                yield error
+            return
+        dim = schema[0]
+        if (not isinstance(value, (list, tuple)) or
+                not isinstance(dim, (Var, Fixed)) or
+                isinstance(dim, Fixed) and len(value) != dim.val):
+            yield path, schema
+            return
+        rest = DataShape(*schema[1:])
+        check = _element_validator(rest)
+        for i, item in enumerate(value):
+            if not check(item):
+                for error in _diagnose(rest, item, path + (i,)):
+                    yield error
+    elif isinstance(schema, Option) and value is not None:
+        for error_path, expected in _diagnose(schema.ty, value, path):
+            # A value which is itself wrong should have been the option
+            yield error_path, schema if error_path == path else expected
+    elif isinstance(schema, Record) and isinstance(value, dict):
+        for name, ds in zip(schema.names, schema.types):
+            item = value.get(name)
+            if not _element_validator(ds)(item):
+                for error in _diagnose(ds, item, path + (name,)):
+                    yield error
+    elif (isinstance(schema, (Record, Tuple)) and
+          isinstance(value, (list, tuple))):
+        if isinstance(schema, Record):
+            keys, types = schema.names, schema.types
+        else:
+            keys, types = range(len(schema.dshapes)), schema.dshapes
+        if len(value) != len(types):
+            yield path, schema
+            return
+        for key, ds, item in zip(keys, types, value):
+            if not _element_validator(ds)(item):
+                for error in _diagnose(ds, item, path + (key,)):
+                    yield error
+    else:
+        yield path, schema
+
+
+#------------------------------------------------------------------------
+# Array validation
+#------------------------------------------------------------------------
+
+def invalid_rows(schema, arr):
+    """
+    Validate a NumPy array against a datashape in bulk, returning a
+    boolean mask which is True for the rows (along the first axis)
+    that don't match.
+
+    Dimensions are checked against the array's shape.  A dtype matches
+    a ctype if it casts to it safely, or else row by row if the values
+    fit in it.  Nulls (NaN, NaT, None, or masked entries of a masked
+    array) always match option types, and otherwise only the types
+    which can hold them: NaN is a valid float64, but not a valid int64.
+    Arrays with fields are checked field by field against a record.  Object arrays, and
+    dimensions which are nested Python sequences, fall back to the
+    compiled validator of each element.
+
+    >>> invalid_rows('var * ?int16', np.array([1, np.nan, 1e6]))
+    array([False, False,  True])
+    >>> x = np.array([(1, 2.5), (-3, 0.5)], dtype=[('a', 'i8'), ('b', 'f8')])
+    >>> invalid_rows('2 * {a: uint32, b: float32}', x)
+    array([False,  True])
+    """
+    if isinstance(schema, _strtypes):
+        schema = dshape(schema)
+    if not isinstance(schema, DataShape) or len(schema) < 2:
+        raise TypeError('Rows can only be validated against a datashape '
+                        'with dimensions, not %s' % schema)
+    if np.ndim(arr) == 0:
+        raise TypeError('Rows can only be validated in an array with '
+                        'dimensions')
+    if not isinstance(arr, np.ndarray):
+        arr = np.asarray(arr)
+    dim = schema[0]
+    if isinstance(dim, Fixed) and dim.val != len(arr):
+        return np.ones(len(arr), dtype=bool)
+    return _invalid(DataShape(*schema[1:]), arr, 1)
+
+
+def _invalid(ds, arr, nlead):
+    """
+    Mask over the first ``nlead`` axes of ``arr`` of the positions whose
+    subarray doesn't match ``ds``.
+    """
+    outer = arr.shape[:nlead]
+    dims, measure = ds[:-1], ds[-1]
+    inner = arr.shape[nlead:]
+    if len(inner) > len(dims):
+        return np.ones(outer, dtype=bool)
+    for dim, size in zip(dims, inner):
+        if isinstance(dim, Ellipsis):
+            raise TypeError('Cannot validate arrays against %s' % ds)
+        if isinstance(dim, Fixed) and dim.val != size:
+            return np.ones(outer, dtype=bool)
+    if len(inner) < len(dims):
+        # The rest of the dimensions can only be Python sequences
+        if arr.dtype.kind != 'O':
+            return np.ones(outer, dtype=bool)
+        element = DataShape(*(dims[len(inner):] + (measure,)))
+        invalid = _invalid_objects(compile_validator(element), arr)
+    else:
+        invalid = _invalid_elements(measure, arr)
+    if invalid.ndim > nlead:
+        invalid = invalid.reshape(outer + (-1,)).any(axis=-1)
+    return invalid
+
+
+def _invalid_objects(check, arr):
+    valid = np.frompyfunc(check, 1, 1)(arr)
+    return ~np.asarray(valid, dtype=bool)
+
+
+def _nulls(arr):
+    kind = arr.dtype.kind
+    if kind in 'fc':
+        return np.isnan(arr)
+    elif kind in 'mM':
+        return np.isnat(arr)
+    elif kind == 'O':
+        return np.equal(arr, None)
+    return np.zeros(arr.shape, dtype=bool)
+
+
+def _invalid_elements(measure, arr):
+    """ Elementwise mask of the entries of ``arr`` not matching ``measure`` """
+    if isinstance(arr, np.ma.MaskedArray) and arr.dtype.names is None:
+        masked = np.ma.getmaskarray(arr)
+        arr = arr.data
+    else:
+        masked = None
+
+    if isinstance(measure, Option):
+        nulls = _nulls(arr)
+        if masked is not None:
+            nulls |= masked
+        return _invalid_elements(measure.ty, arr) & ~nulls
+
+    kind = arr.dtype.kind
+    if kind == 'O':
+        invalid = _invalid_objects(compile_validator(measure), arr)
+    elif isinstance(measure, CType):
+        invalid = _invalid_values(to_numpy_dtype(measure), arr)
+    elif isinstance(measure, String):
+        if kind not in 'US':
+            invalid = np.ones(arr.shape, dtype=bool)
+        elif measure.fixlen is not None:
+            invalid = np.char.str_len(arr) > measure.fixlen
+        else:
+            invalid = np.zeros(arr.shape, dtype=bool)
+    elif isinstance(measure, (Date, DateTime)):
+        # NaT has no Python date or datetime
+        invalid = (np.isnat(arr) if kind == 'M' else
+                   np.ones(arr.shape, dtype=bool))
+    elif isinstance(measure, Record) and arr.dtype.names is not None:
+        invalid = np.zeros(arr.shape, dtype=bool)
+        for name, ds in zip(measure.names, measure.types):
+            if name not in arr.dtype.names:
+                return np.ones(arr.shape, dtype=bool)
+            invalid |= _invalid(ds, arr[name], arr.ndim)
+    else:
+        invalid = np.ones(arr.shape, dtype=bool)
+
+    if masked is not None:
+        invalid |= masked
+    return invalid
+
+
+def _invalid_values(dtype, arr):
+    """ Mask of the values of ``arr`` which don't fit in ``dtype`` """
+    src = arr.dtype
+    if (src.kind == 'b') != (dtype.kind == 'b'):
+        # Bools are not numbers, as for Python bools
+        return np.ones(arr.shape, dtype=bool)
+    elif np.can_cast(src, dtype, casting='safe'):
+        return np.zeros(arr.shape, dtype=bool)
+    elif src.kind in 'iu' and dtype.kind in 'iu':
+        info, src_info = np.iinfo(dtype), np.iinfo(src)
+        invalid = np.zeros(arr.shape, dtype=bool)
+        if info.min > src_info.min:
+            invalid |= arr < info.min
+        if info.max < src_info.max:
+            invalid |= arr > info.max
+        return invalid
+    elif src.kind in 'fc' and dtype.kind == src.kind:
+        # Infinities and NaN fit any floating point type
+        fmax = np.finfo(dtype).max
+        with np.errstate(invalid='ignore'):
+            parts = [arr.real, arr.imag] if src.kind == 'c' else [arr]
+            invalid = np.zeros(arr.shape, dtype=bool)
+            for part in parts:
+                invalid |= np.isfinite(part) & (np.abs(part) > fmax)
+            return invalid
+    elif src.kind == 'f' and dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        with np.errstate(invalid='ignore'):
+            return ~((arr >= info.min) & (arr <= info.max) &
+                     (np.floor(arr) == arr))
+    return np.ones(arr.shape, dtype=bool)
@@ -12,15 +12,29 @@ from .error import UnificationError
 from .validation import validate
 from . import coretypes
 from itertools import chain
-from .internal_utils import reverse_dict
+from .internal_utils import reverse_dict, LRUCache
 
 
-__all__ = ['dshape', 'dshapes', 'has_var_dim', 'has_ellipsis',
+__all__ = ['dshape', 'dshapes', 'dshapes_bulk', 'has_var_dim', 'has_ellipsis',
            'cat_dshapes', 'from_ctypes', 'from_cffi', 'to_ctypes']
 
 
 PY3 = (sys.version_info[:2] >= (3, 0))
 
+# Parsed and validated datashapes, keyed on (string, symbol table).
+# Types are immutable, so the cached objects are handed out directly.
+# Resize with ``dshape_cache.maxsize = n``, and call ``clear_cache()``
+# after modifying a symbol table in place.
+dshape_cache = LRUCache(maxsize=1024)
+
+
+def clear_cache():
+    """
+    Empty the cache of parsed datashape strings used by ``dshape``.
+    """
+    dshape_cache.clear()
+
+
 #------------------------------------------------------------------------
 # Utility Functions for DataShapes
 #------------------------------------------------------------------------
@@ -44,24 +58,107 @@ def dshape(o):
     ctype("int32")
     """
     if isinstance(o, coretypes.DataShape):
-        return o
-    if isinstance(o, py2help._strtypes):
-        ds = parser.parse(o, type_symbol_table.sym)
-    elif isinstance(o, (coretypes.CType, coretypes.String,
-                        coretypes.Record, coretypes.JSON,
-                        coretypes.Date, coretypes.Time, coretypes.DateTime,
-                        coretypes.Unit)):
-        ds = coretypes.DataShape(o)
-    elif isinstance(o, coretypes.Mono):
         ds = o
-    elif isinstance(o, (list, tuple)):
-        ds = coretypes.DataShape(*o)
+    elif isinstance(o, py2help._strtypes):
+        key = (o, type_symbol_table.sym)
+        ds = dshape_cache.get(key)
+        interning = coretypes.interning_enabled()
+        if ds is None or interning and not getattr(ds, '_interned', False):
+            if ds is None:
+                ds = parser.parse(o, type_symbol_table.sym)
+                validate(ds)
+            # Cache the interned type, so hits need no further work
+            if interning:
+                ds = coretypes.intern_type(ds)
+            dshape_cache.put(key, ds)
+        return ds
     else:
-        raise TypeError('Cannot create dshape from object of type %s' % type(o))
-    validate(ds)
+        if isinstance(o, (coretypes.CType, coretypes.String,
+                          coretypes.Record, coretypes.JSON,
+                          coretypes.Date, coretypes.Time, coretypes.DateTime,
+                          coretypes.Unit)):
+            ds = coretypes.DataShape(o)
+        elif isinstance(o, coretypes.Mono):
+            ds = o
+        elif isinstance(o, (list, tuple)):
+            ds = coretypes.DataShape(*o)
+        else:
+            raise TypeError('Cannot create dshape from object of type %s' % type(o))
+        validate(ds)
+    if coretypes.interning_enabled():
+        ds = coretypes.intern_type(ds)
     return ds
 
 
+def _parse_or_none(s):
+    """ Parse and validate one string, or None if that fails """
+    try:
+        ds = parser.parse(s, type_symbol_table.sym)
+        validate(ds)
+        return ds
+    except Exception:
+        return None
+
+
+def dshapes_bulk(iterable, workers=None, dedupe=True):
+    """
+    Parse many datashapes at once, collecting errors instead of raising.
+
+    Returns ``(results, errors)``.  ``results`` has one entry per input,
+    in input order, which is None where parsing failed, and ``errors``
+    is a list of ``(index, exception)`` pairs for those entries.  The
+    results are interned, so equal types and sub-types are shared
+    between them.
+
+    With ``dedupe``, each distinct string is only parsed once, and
+    ``workers`` parses them on a pool of that many processes (-1 for
+    one per CPU).  The parser cache used by ``dshape`` is bypassed.
+
+    >>> results, errors = dshapes_bulk(['3 * int32', 'var * int32', '3 * $'])
+    >>> results[:2]
+    [dshape("3 * int32"), dshape("var * int32")]
+    >>> results[0][1] is results[1][1]
+    True
+    >>> errors[0][0]
+    2
+    """
+    items = list(iterable)
+    strings = [o for o in items if isinstance(o, py2help._strtypes)]
+    if dedupe:
+        strings = list(dict.fromkeys(strings))
+    if workers is None or workers == 1 or len(strings) < 2:
+        parsed = list(map(_parse_or_none, strings))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import cpu_count
+        workers = cpu_count() if workers < 0 else workers
+        with ProcessPoolExecutor(workers) as pool:
+            chunksize = max(1, len(strings) // (4 * workers))
+            parsed = list(pool.map(_parse_or_none, strings,
+                                   chunksize=chunksize))
+    parsed = [None if ds is None else coretypes.intern_type(ds)
+              for ds in parsed]
+
+    if dedupe:
+        lookup = dict(zip(strings, parsed)).get
+    else:
+        remaining = iter(parsed)
+        lookup = lambda o: next(remaining)
+
+    results, errors = [], []
+    for i, o in enumerate(items):
+        ds = lookup(o) if isinstance(o, py2help._strtypes) else None
+        if ds is None:
+            # Failures are parsed again here to get their exception,
+            # which might not survive the trip back from a worker
+            try:
+                ds = coretypes.intern_type(dshape(o))
+            except Exception as e:
+                errors.append((i, e))
+        results.append(ds)
+    return results, errors
+
+
 def cat_dshapes(dslist):
     """
     Concatenates a list of dshapes together along